@@ -0,0 +1,203 @@
+"""
+Headless HTTP API for the Q&A and summary modes.
+
+    uvicorn api:app --workers 1
+
+Concurrent requests for the same (video_id, language) share one transcript
+fetch and one FAISS build; CPU-bound work runs on a bounded thread pool.
+"""
+import asyncio
+import os
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel
+
+from utils import metrics
+from utils.extract_video_id import extract_video_id
+from utils.llm_scheduler import SchedulerOverloaded, get_scheduler
+from utils.providers import get_embedding
+from utils.semantic_cache import answer_cache
+from utils.single_flight import SingleFlight
+from utils.transcript_cache import get_transcript, list_available_transcript_languages
+from utils.video_pipeline import VideoPipeline
+
+BUILD_WORKERS = int(os.getenv("API_BUILD_WORKERS", 2))
+MAX_PIPELINES = int(os.getenv("API_MAX_PIPELINES", 64))
+
+
+class VideoRequest(BaseModel):
+    video: str
+    language: str
+    # Requests with the same session share LLM capacity fairly with other sessions
+    session_id: Optional[str] = None
+
+
+class QuestionRequest(VideoRequest):
+    question: str
+    search_type: str = "mmr"
+    # Set to false to skip answers reused from similar questions
+    use_cache: bool = True
+
+
+class PipelineRegistry:
+    """
+    Holds built pipelines (LRU) and makes sure each artifact is built once.
+    """
+
+    def __init__(self, transcript_source=get_transcript, build_workers=BUILD_WORKERS,
+                 max_pipelines=MAX_PIPELINES):
+        self.transcript_source = transcript_source
+        self.max_pipelines = max_pipelines
+        self.executor = ThreadPoolExecutor(max_workers=build_workers, thread_name_prefix="build")
+        self.single_flight = SingleFlight()
+        # Executed builds per artifact kind ("transcript", "index", "qa:mmr", ...)
+        self.build_counts = Counter()
+        self._pipelines = OrderedDict()
+
+    def pipeline(self, video_id, language):
+        key = (video_id, language)
+        pipeline = self._pipelines.get(key)
+        if pipeline is None:
+            pipeline = VideoPipeline(video_id, language, transcript_source=self.transcript_source)
+            self._pipelines[key] = pipeline
+            while len(self._pipelines) > self.max_pipelines:
+                self._pipelines.popitem(last=False)
+        self._pipelines.move_to_end(key)
+        return pipeline
+
+    async def _build(self, artifact, pipeline, fn):
+        # Anything that may block (fetching, embedding, BM25, taking a pipeline lock)
+        # runs on the build pool, never on the event loop
+        loop = asyncio.get_running_loop()
+        key = (artifact, pipeline.video_id, pipeline.language)
+
+        def start():
+            self.build_counts[artifact] += 1
+            return loop.run_in_executor(self.executor, fn)
+
+        return await self.single_flight.do(key, start)
+
+    async def with_transcript(self, video_id, language):
+        pipeline = self.pipeline(video_id, language)
+        if not pipeline.ready("transcript"):
+            error = await self._build("transcript", pipeline, pipeline.load_transcript)
+            if error:
+                raise HTTPException(status_code=404, detail=error)
+        return pipeline
+
+    async def with_index(self, video_id, language):
+        pipeline = await self.with_transcript(video_id, language)
+        if not pipeline.ready("index"):
+            await self._build("index", pipeline, lambda: pipeline.vector_store)
+        return pipeline
+
+    async def chain(self, pipeline, name, build):
+        if pipeline.ready(name):
+            return build()
+        return await self._build(name, pipeline, build)
+
+
+def _video_id(video):
+    video_id = extract_video_id(video)
+    if not video_id:
+        raise HTTPException(status_code=422, detail="Invalid YouTube URL or ID.")
+    return video_id
+
+
+def _embedding_cache_stats():
+    embedding = get_embedding()
+    if not hasattr(embedding, "hit_rate"):
+        return None
+    return {**embedding.stats, "hit_rate": embedding.hit_rate()}
+
+
+def _run_config(request):
+    config = {"callbacks": metrics.callbacks()}
+    if request.session_id:
+        config["metadata"] = {"session_id": request.session_id}
+    return config
+
+
+def create_app(transcript_source=get_transcript, languages_source=list_available_transcript_languages,
+               build_workers=BUILD_WORKERS):
+    app = FastAPI(title="YouTube Transcript Assistant")
+    registry = PipelineRegistry(transcript_source=transcript_source, build_workers=build_workers)
+    app.state.registry = registry
+
+    @app.exception_handler(SchedulerOverloaded)
+    async def scheduler_overloaded(request, exc):
+        # Backpressure: tell clients to retry instead of queueing without bound
+        return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "5"})
+
+    @app.get("/languages")
+    async def languages(video: str):
+        video_id = _video_id(video)
+        lang_info = await asyncio.get_running_loop().run_in_executor(None, languages_source, video_id)
+        if isinstance(lang_info, dict) and "error" in lang_info:
+            raise HTTPException(status_code=404, detail=lang_info["error"])
+        return {"video_id": video_id, "languages": lang_info}
+
+    @app.post("/qa")
+    async def qa(request: QuestionRequest):
+        if request.search_type not in ("similarity", "mmr", "compression", "hybrid"):
+            raise HTTPException(status_code=422, detail=f"Unknown search_type: {request.search_type}")
+        video_id = _video_id(request.video)
+        loop = asyncio.get_running_loop()
+        if request.use_cache:
+            # Checked before the transcript and index, so a cached answer never waits on building them
+            answer, question_vector = await loop.run_in_executor(
+                None, registry.pipeline(video_id, request.language).cached_answer,
+                request.question, request.search_type
+            )
+            if answer is not None:
+                return {"video_id": video_id, "answer": answer, "cached": True}
+        else:
+            answer_cache.bypass()
+
+        pipeline = await registry.with_index(video_id, request.language)
+        chain = await registry.chain(pipeline, f"qa:{request.search_type}",
+                                     lambda: pipeline.qa_chain(request.search_type))
+        answer = await chain.ainvoke({"question": request.question, "language": request.language},
+                                     config=_run_config(request))
+        if request.use_cache:
+            pipeline.remember_answer(request.search_type, question_vector, answer)
+        return {"video_id": pipeline.video_id, "answer": answer, "cached": False}
+
+    @app.post("/summary/concise")
+    async def concise_summary(request: VideoRequest):
+        pipeline = await registry.with_transcript(_video_id(request.video), request.language)
+        chain = await registry.chain(pipeline, "concise_summary", pipeline.concise_summary_chain)
+        summary = await chain.ainvoke({"transcript": pipeline.transcript, "language": request.language},
+                                      config=_run_config(request))
+        return {"video_id": pipeline.video_id, "summary": summary}
+
+    @app.post("/summary/detailed")
+    async def detailed_summary(request: VideoRequest):
+        pipeline = await registry.with_transcript(_video_id(request.video), request.language)
+        chain = await registry.chain(pipeline, "detailed_summary", pipeline.detailed_summary_chain)
+        summary = await chain.ainvoke(pipeline.transcript, config=_run_config(request))
+        return {"video_id": pipeline.video_id, "summary": summary}
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def prometheus_metrics():
+        return metrics.render_prometheus()
+
+    @app.get("/stats")
+    async def stats():
+        return {
+            "single_flight": registry.single_flight.stats,
+            "in_flight": registry.single_flight.in_flight(),
+            "builds": dict(registry.build_counts),
+            "answer_cache": {**answer_cache.stats, "hit_rate": answer_cache.hit_rate()},
+            "embedding_cache": _embedding_cache_stats(),
+            "llm_scheduler": get_scheduler().snapshot(),
+        }
+
+    return app
+
+
+app = create_app()
@@ -0,0 +1,57 @@
+"""
+Memory per video and recall@k of the compact index options against the flat index.
+
+    python -m benchmarks.bench_compact_index --minutes 60 --dimension 768
+
+Recall@k is the share of the flat index's top-k chunks that the compact index
+also returns, averaged over queries built from random transcript sentences.
+"""
+import argparse
+import random
+
+import numpy as np
+
+from benchmarks.fakes import FakeEmbeddings
+from benchmarks.synthetic import synthetic_transcript_list
+from utils.compact_vectorstore import INDEX_TYPES, create_compact_vectorstore, describe_index, vectorstore_nbytes
+from utils.create_vectorstore import create_vectorstore
+from utils.split_segments import split_segments
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=int, default=60)
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--k", type=int, default=6)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    segments = synthetic_transcript_list(args.minutes)
+    transcript = " ".join(segment["text"] for segment in segments)
+    chunks = split_segments(segments)
+    embedding = FakeEmbeddings(dimension=args.dimension)
+    vectors = embedding.embed_matrix([chunk.page_content for chunk in chunks])
+
+    rng = random.Random(0)
+    queries = embedding.embed_matrix([rng.choice(segments)["text"] for _ in range(args.queries)])
+    _, reference = create_vectorstore(chunks, embedding, vectors=vectors).index.search(queries, args.k)
+
+    print(f"{len(chunks)} chunks, dimension {args.dimension}, {args.minutes} min video\n")
+    print(f"{'index':8s} {'built':>8s} {'index KB':>9s} {'docstore KB':>12s} {'total KB':>9s} {'recall@k':>9s}")
+
+    baseline = create_vectorstore(chunks, embedding, vectors=vectors)
+    index_bytes, docstore_bytes = vectorstore_nbytes(baseline)
+    print(f"{'baseline':8s} {describe_index(baseline.index):>8s} {index_bytes / 1024:9.1f} {docstore_bytes / 1024:12.1f} "
+          f"{(index_bytes + docstore_bytes) / 1024:9.1f} {1.0:9.3f}")
+
+    for index_type in INDEX_TYPES:
+        store = create_compact_vectorstore(chunks, transcript, embedding, index_type, vectors=vectors)
+        index_bytes, docstore_bytes = vectorstore_nbytes(store)
+        _, found = store.index.search(queries, args.k)
+        recall = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(reference, found)])
+        print(f"{index_type:8s} {describe_index(store.index):>8s} {index_bytes / 1024:9.1f} {docstore_bytes / 1024:12.1f} "
+              f"{(index_bytes + docstore_bytes) / 1024:9.1f} {recall:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Latency, LLM and embedding call counts of the "compression" search type:
+LLMChainExtractor against the local ExtractiveCompressor. The index uses fake
+"remote" embeddings, so the embedding column shows calls the compressor adds
+on top of embedding the query for retrieval.
+
+    python -m benchmarks.bench_compression --latency 0.8 --questions 10
+"""
+import argparse
+import time
+
+from langchain.retrievers import ContextualCompressionRetriever
+from langchain.retrievers.document_compressors import LLMChainExtractor
+
+from benchmarks.bench_retrieval import synthetic_qa
+from benchmarks.fakes import FakeChatModel, FakeEmbeddings
+from utils.create_vectorstore import create_vectorstore
+from utils.estimate_tokens import estimate_tokens
+from utils.extractive_compressor import ExtractiveCompressor
+
+
+def run(name, compressor, base_retriever, questions, model, embedding):
+    retriever = ContextualCompressionRetriever(base_compressor=compressor, base_retriever=base_retriever)
+    calls_before = model.calls
+    embedding_calls_before = embedding.calls
+    tokens = 0
+    start = time.perf_counter()
+    for question, _ in questions:
+        tokens += sum(estimate_tokens(doc.page_content) for doc in retriever.invoke(question))
+    elapsed = (time.perf_counter() - start) / len(questions)
+    calls = (model.calls - calls_before) / len(questions)
+    embedding_calls = (embedding.calls - embedding_calls_before) / len(questions)
+    print(f"{name:12s} {elapsed * 1000:10.1f} {calls:10.1f} {embedding_calls:10.1f} {tokens / len(questions):14.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.8, help="seconds per fake LLM call")
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--k", type=int, default=6)
+    args = parser.parse_args()
+
+    docs, questions = synthetic_qa(300)
+    questions = questions[:args.questions]
+    embedding = FakeEmbeddings(dimension=256)
+    base_retriever = create_vectorstore(docs, embedding).as_retriever(search_type="mmr",
+                                                                     search_kwargs={"k": args.k})
+    model = FakeChatModel(latency=args.latency)
+
+    print(f"{'compressor':12s} {'ms/query':>10s} {'LLM calls':>10s} {'embed calls':>10s} {'context tokens':>14s}")
+    run("llm", LLMChainExtractor.from_llm(model), base_retriever, questions, model, embedding)
+    run("local", ExtractiveCompressor(), base_retriever, questions, model, embedding)
+    # What the local compressor cost when it scored with the index's (remote) embedding
+    run("local+store", ExtractiveCompressor(embedding=embedding), base_retriever, questions, model, embedding)
+
+
+if __name__ == "__main__":
+    main()
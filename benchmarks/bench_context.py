@@ -0,0 +1,54 @@
+"""
+Prompt tokens saved by format_docs' context packing on the benchmark transcripts.
+
+    python -m benchmarks.bench_context --durations 5 60 300
+
+For each question the same retrieved chunks are formatted three ways, all with
+the [t=MM:SS] prefixes and separators counted: one timestamped passage per chunk
+as retrieved, merged with the overlap removed but no budget, and merged under
+--budget tokens. The app's CONTEXT_TOKEN_BUDGET (2000) is a cap for large k and
+doesn't bind at k=6, so the benchmark default is tighter to show the cut.
+"""
+import argparse
+
+from benchmarks.bench_pipeline import DURATIONS, QUESTIONS
+from benchmarks.fakes import FakeEmbeddings
+from benchmarks.synthetic import synthetic_transcript_list
+from utils.create_vectorstore import create_vectorstore
+from utils.estimate_tokens import estimate_tokens
+from utils.format_docs import SEPARATOR, format_docs
+from utils.format_timestamp import format_timestamp
+from utils.split_segments import split_segments
+
+
+def naive_format(docs):
+    return SEPARATOR.join(f"[t={format_timestamp(doc.metadata['start'])}] {doc.page_content}" for doc in docs)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--durations", type=int, nargs="+", default=DURATIONS)
+    parser.add_argument("--k", type=int, default=6)
+    parser.add_argument("--budget", type=int, default=1000)
+    parser.add_argument("--search-type", default="mmr")
+    args = parser.parse_args()
+
+    print(f"{'minutes':>7s} {'naive tokens':>13s} {'merged tokens':>14s} {'saved':>7s} "
+          f"{'budgeted tokens':>16s} {'saved':>7s}")
+    for minutes in args.durations:
+        chunks = split_segments(synthetic_transcript_list(minutes))
+        vector_store = create_vectorstore(chunks, FakeEmbeddings())
+        retriever = vector_store.as_retriever(search_type=args.search_type, search_kwargs={"k": args.k})
+
+        naive = merged = budgeted = 0
+        for question in QUESTIONS:
+            docs = retriever.invoke(question)
+            naive += estimate_tokens(naive_format(docs))
+            merged += estimate_tokens(format_docs(docs, max_tokens=None))
+            budgeted += estimate_tokens(format_docs(docs, max_tokens=args.budget))
+        n = len(QUESTIONS)
+        print(f"{minutes:7d} {naive / n:13.0f} {merged / n:14.0f} {1 - merged / naive:7.1%} "
+              f"{budgeted / n:16.0f} {1 - budgeted / naive:7.1%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Cold-start import check for the modules ui.py loads on every Streamlit run.
+
+    python -m benchmarks.bench_import_time
+
+Each module is imported in a fresh interpreter with `-X importtime`. The run
+fails (exit code 1) if a module goes over its time budget or pulls in a
+client library that should only load on first use.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time budgets in milliseconds
+BUDGETS_MS = {
+    "utils.extract_video_id": 50,
+    "utils.format_docs": 50,
+    "utils.providers": 50,
+    "utils.get_transcript": 400,
+    "utils.transcript_cache": 400,
+    "utils.split_text": 1500,
+    "utils.create_vectorstore": 2500,
+    "utils.create_qa_chain": 2500,
+    "summarization_chain": 2500,
+}
+
+# Heavy clients that must only be imported when a provider is first used
+LAZY_MODULES = ("langchain_google_genai", "google.generativeai")
+
+
+def measure(module):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr}")
+
+    cumulative_us = 0
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        imported.add(name)
+        if name == module:
+            cumulative_us = int(cumulative)
+    return cumulative_us / 1000, imported
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--slack", type=float, default=1.0, help="multiplier applied to every budget")
+    args = parser.parse_args()
+
+    failures = []
+    for module, budget in BUDGETS_MS.items():
+        elapsed_ms, imported = measure(module)
+        leaked = [name for name in LAZY_MODULES if name in imported]
+        status = "ok"
+        if elapsed_ms > budget * args.slack:
+            status = "SLOW"
+            failures.append(f"{module}: {elapsed_ms:.0f}ms > {budget * args.slack:.0f}ms")
+        if leaked:
+            status = "EAGER"
+            failures.append(f"{module}: imports {', '.join(leaked)} at import time")
+        print(f"{module:28s} {elapsed_ms:8.1f}ms  budget {budget:5d}ms  {status}")
+
+    if failures:
+        print("\nImport-time regressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
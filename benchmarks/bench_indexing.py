@@ -0,0 +1,35 @@
+"""
+Offline indexing throughput with the hashing embedding backend.
+
+    python -m benchmarks.bench_indexing --chunks 2000 --batch-sizes 32 128 512
+"""
+import argparse
+import time
+
+from benchmarks.bench_summarization import synthetic_transcript
+from utils.create_vectorstore import create_vectorstore
+from utils.embeddings import HashingEmbeddings
+from utils.split_text import split_text
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--dimension", type=int, default=1024)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[32, 128, 512])
+    args = parser.parse_args()
+
+    chunks = split_text(synthetic_transcript(args.chunks, 1000), chunk_size=1200, chunk_overlap=200)
+    print(f"{len(chunks)} chunks, dimension {args.dimension}")
+
+    for batch_size in args.batch_sizes:
+        embedding = HashingEmbeddings(dimension=args.dimension, batch_size=batch_size)
+        start = time.perf_counter()
+        vector_store = create_vectorstore(chunks, embedding)
+        elapsed = time.perf_counter() - start
+        vector_store.similarity_search("synthetic transcript sentence", k=6)
+        print(f"batch {batch_size:5d}: {elapsed:.3f}s  {len(chunks) / elapsed:8.0f} chunks/s")
+
+
+if __name__ == "__main__":
+    main()
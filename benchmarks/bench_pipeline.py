@@ -0,0 +1,171 @@
+"""
+Offline end-to-end benchmark of the transcript pipeline.
+
+    python -m benchmarks.bench_pipeline                     # compare against baseline.json
+    python -m benchmarks.bench_pipeline --update-baseline   # record a new baseline
+    python -m benchmarks.bench_pipeline --chunk-size 800 --k 4 --durations 5 60
+
+Synthetic transcripts (5 minutes to 5 hours) go through split, index build,
+retrieval, Q&A and both summary modes using deterministic fake chat and
+embedding models with injected latency. Each step reports wall time, peak
+Python memory and model call counts. Time and memory may grow by at most
+--tolerance over the baseline, call counts by at most --call-tolerance;
+anything beyond that fails the run with exit code 1.
+
+The committed baseline.json only holds the machine-independent call and
+chunk counts; --update-baseline on a given machine adds its time and memory.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from benchmarks.fakes import FakeChatModel, FakeEmbeddings
+from benchmarks.synthetic import synthetic_transcript_list
+from utils import providers
+from utils.create_qa_chain import create_qa_chain
+from utils.create_vectorstore import create_vectorstore
+from utils.hybrid_retriever import HybridRetriever
+from utils.split_segments import split_segments
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DURATIONS = [5, 30, 60, 180, 300]
+QUESTIONS = [
+    "What is the main idea of the video?",
+    "What do they say about caching?",
+    "How does the budget change over time?",
+]
+
+
+def measure(fn, chat_model, embedding):
+    # Timed and counted without tracemalloc, which slows allocation-heavy steps;
+    # peak memory comes from a second, traced run
+    chat_calls, embedding_calls = chat_model.calls, embedding.calls
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    chat_calls, embedding_calls = chat_model.calls - chat_calls, embedding.calls - embedding_calls
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {
+        "seconds": round(elapsed, 4),
+        "peak_mb": round(peak / 1024 ** 2, 2),
+        "llm_calls": chat_calls,
+        "embedding_calls": embedding_calls,
+    }
+
+
+def run_duration(minutes, args):
+    chat_model = FakeChatModel(latency=args.llm_latency)
+    embedding = FakeEmbeddings(latency=args.embedding_latency)
+    providers.register("chat_model", chat_model)
+    providers.register("cached_chat_model", chat_model)
+    providers.register("cached_interactive_chat_model", chat_model)
+    providers.register("embedding", embedding)
+
+    segments = synthetic_transcript_list(minutes)
+    transcript = " ".join(segment["text"] for segment in segments)
+    results = {}
+
+    chunks, results["split"] = measure(
+        lambda: split_segments(segments, chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap),
+        chat_model, embedding
+    )
+    results["split"]["chunks"] = len(chunks)
+
+    vector_store, results["index"] = measure(lambda: create_vectorstore(chunks, embedding), chat_model, embedding)
+
+    retrievers = {
+        "similarity": vector_store.as_retriever(search_type="similarity", search_kwargs={"k": args.k}),
+        "mmr": vector_store.as_retriever(search_type="mmr", search_kwargs={"k": args.k}),
+        "hybrid": HybridRetriever.from_vector_store(vector_store, k=args.k),
+    }
+    for search_type, retriever in retrievers.items():
+        _, results[f"retrieve_{search_type}"] = measure(
+            lambda: [retriever.invoke(question) for question in QUESTIONS], chat_model, embedding
+        )
+
+    qa_chain = create_qa_chain(vector_store=vector_store, search_type="mmr", search_kwargs={"k": args.k})
+    _, results["qa"] = measure(
+        lambda: [qa_chain.invoke({"question": question, "language": "en"}) for question in QUESTIONS],
+        chat_model, embedding
+    )
+
+    concise = create_qa_chain(summaryType="concise_summary", transcript=transcript)
+    _, results["concise_summary"] = measure(
+        lambda: concise.invoke({"transcript": transcript, "language": "en"}), chat_model, embedding
+    )
+
+    detailed = create_qa_chain(summaryType="detailed_summary", transcript=transcript)
+    _, results["detailed_summary"] = measure(lambda: detailed.invoke(transcript), chat_model, embedding)
+    return results
+
+
+def compare(results, baseline, tolerance, call_tolerance):
+    failures = []
+    for duration, steps in results.items():
+        for step, values in steps.items():
+            expected = baseline.get(duration, {}).get(step)
+            if expected is None:
+                continue
+            for metric, value in values.items():
+                reference = expected.get(metric)
+                if reference is None:
+                    continue
+                allowed = call_tolerance if metric.endswith("calls") or metric == "chunks" else tolerance
+                # Small absolute floor so sub-millisecond steps don't flap
+                if value > reference * (1 + allowed) + (0.005 if metric == "seconds" else 0):
+                    failures.append(f"{duration}min {step} {metric}: {value} > baseline {reference}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--durations", type=int, nargs="+", default=DURATIONS, help="video lengths in minutes")
+    parser.add_argument("--chunk-size", type=int, default=1200)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--k", type=int, default=6)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--embedding-latency", type=float, default=0.01)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--call-tolerance", type=float, default=0.0)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = {}
+    for minutes in args.durations:
+        results[str(minutes)] = run_duration(minutes, args)
+        print(f"\n== {minutes} min transcript ==")
+        print(f"{'step':22s} {'seconds':>9s} {'peak MB':>8s} {'LLM':>5s} {'embed':>6s}")
+        for step, values in results[str(minutes)].items():
+            print(f"{step:22s} {values['seconds']:9.3f} {values['peak_mb']:8.2f} "
+                  f"{values['llm_calls']:5d} {values['embedding_calls']:6d}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\nbaseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nno baseline at {args.baseline}; run with --update-baseline to create one")
+        sys.exit(1)
+
+    with open(args.baseline, encoding="utf-8") as f:
+        failures = compare(results, json.load(f), args.tolerance, args.call_tolerance)
+    if failures:
+        print("\nRegressions against baseline:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nno regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Retrieval quality and latency per search type on a fixed synthetic QA set.
+
+    python -m benchmarks.bench_retrieval
+
+The transcript is filler talk with one planted fact per chunk ("the budget for
+project Kestrel-417 was 9312 dollars"). Each question asks about one fact by its
+exact name and number, the case dense-only search tends to miss. Uses the
+offline hashing embeddings, so no network is needed.
+"""
+import argparse
+import random
+import time
+
+from langchain_core.documents import Document
+
+from utils.create_vectorstore import create_vectorstore
+from utils.embeddings import HashingEmbeddings
+from utils.hybrid_retriever import HybridRetriever
+
+FILLER = [
+    "so today we are going to talk about how teams plan their work",
+    "and as you can see the numbers keep changing every quarter",
+    "let me know in the comments what you think about this approach",
+    "the project budget depends on many factors like people and time",
+    "we looked at several projects and their budgets over the years",
+]
+NAMES = ["Kestrel", "Osprey", "Heron", "Falcon", "Merlin", "Harrier", "Kite", "Condor"]
+
+
+def synthetic_qa(num_chunks, seed=0):
+    rng = random.Random(seed)
+    docs, questions = [], []
+    for i in range(num_chunks):
+        name = f"{rng.choice(NAMES)}-{rng.randint(100, 999)}"
+        amount = rng.randint(1000, 99999)
+        filler = " ".join(rng.choice(FILLER) for _ in range(12))
+        docs.append(Document(page_content=f"{filler}. the budget for project {name} was {amount} dollars. {filler}",
+                             metadata={"start_index": i}))
+        questions.append((f"What was the budget for project {name}?", i))
+    return docs, questions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=500)
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--k", type=int, default=6)
+    args = parser.parse_args()
+
+    docs, questions = synthetic_qa(args.chunks)
+    questions = questions[:args.questions]
+    vector_store = create_vectorstore(docs, HashingEmbeddings(dimension=256))
+
+    retrievers = {
+        "similarity": vector_store.as_retriever(search_type="similarity", search_kwargs={"k": args.k}),
+        "mmr": vector_store.as_retriever(search_type="mmr", search_kwargs={"k": args.k}),
+    }
+    start = time.perf_counter()
+    retrievers["hybrid"] = HybridRetriever.from_vector_store(vector_store, k=args.k)
+    print(f"BM25 index over {len(docs)} chunks built in {(time.perf_counter() - start) * 1000:.1f}ms\n")
+
+    print(f"{'search_type':12s} {'hit@1':>6s} {'hit@k':>6s} {'MRR':>6s} {'ms/query':>9s}")
+    for name, retriever in retrievers.items():
+        hits_1 = hits_k = reciprocal_ranks = 0.0
+        start = time.perf_counter()
+        for question, gold in questions:
+            ranked = [doc.metadata["start_index"] for doc in retriever.invoke(question)]
+            if gold in ranked:
+                rank = ranked.index(gold)
+                hits_k += 1
+                hits_1 += rank == 0
+                reciprocal_ranks += 1 / (rank + 1)
+        elapsed_ms = (time.perf_counter() - start) * 1000 / len(questions)
+        n = len(questions)
+        print(f"{name:12s} {hits_1 / n:6.2f} {hits_k / n:6.2f} {reciprocal_ranks / n:6.2f} {elapsed_ms:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Load test for the LLM scheduler: simulated users against a local fake model.
+
+Interactive users ask questions with some think time in between while other
+sessions run summary map stages. Reports throughput and p50/p99 latency per
+priority class, with and without the scheduler.
+
+    python -m benchmarks.bench_scheduler --users 20 --summarizers 4 --latency 0.2
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from benchmarks.fakes import FakeChatModel
+from utils.llm_scheduler import LLMScheduler, ScheduledChatModel, SchedulerOverloaded
+
+
+def interactive_user(model, session, questions, think_time, latencies, rejected):
+    for i in range(questions):
+        start = time.perf_counter()
+        try:
+            model.invoke(f"question {i} from {session}", config={"metadata": {"session_id": session}})
+            latencies.append(time.perf_counter() - start)
+        except SchedulerOverloaded:
+            rejected.append(session)
+        time.sleep(think_time)
+
+
+def summarizer(model, session, chunks, concurrency, latencies, rejected):
+    def call(i):
+        start = time.perf_counter()
+        try:
+            model.invoke(f"summarize chunk {i} " * 50, config={"metadata": {"session_id": session}})
+            latencies.append(time.perf_counter() - start)
+        except SchedulerOverloaded:
+            rejected.append(session)
+
+    # Same fan-out as the summarizer's map step
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(call, range(chunks)))
+
+
+def run(args, scheduled):
+    fake = FakeChatModel(latency=args.latency)
+    results = {"interactive": [], "summary": []}
+    rejected = []
+    if scheduled:
+        scheduler = LLMScheduler(max_concurrency=args.max_concurrency, requests_per_minute=args.rpm,
+                                 tokens_per_minute=args.tpm, max_queue=args.max_queue)
+        interactive_model = ScheduledChatModel(inner=fake, scheduler=scheduler, priority="interactive")
+        summary_model = ScheduledChatModel(inner=fake, scheduler=scheduler, priority="summary")
+    else:
+        # Without a scheduler, cap concurrency with a plain semaphore so the comparison is fair
+        scheduler = None
+        semaphore = threading.Semaphore(args.max_concurrency)
+        interactive_model = summary_model = _Throttled(fake, semaphore)
+
+    threads = [
+        threading.Thread(target=interactive_user, args=(interactive_model, f"user-{i}", args.questions,
+                                                        args.think_time, results["interactive"], rejected))
+        for i in range(args.users)
+    ] + [
+        threading.Thread(target=summarizer, args=(summary_model, f"summary-{i}", args.chunks,
+                                                  args.map_concurrency, results["summary"], rejected))
+        for i in range(args.summarizers)
+    ]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return results, len(rejected), elapsed, scheduler
+
+
+class _Throttled:
+    def __init__(self, model, semaphore):
+        self.model = model
+        self.semaphore = semaphore
+
+    def invoke(self, prompt, config=None):
+        with self.semaphore:
+            return self.model.invoke(prompt, config=config)
+
+
+def report(label, results, rejected, elapsed):
+    completed = sum(len(latencies) for latencies in results.values())
+    print(f"{label}: {completed} calls in {elapsed:.2f}s ({completed / elapsed:.1f} calls/s), {rejected} rejected")
+    for priority, latencies in results.items():
+        if latencies:
+            p50, p99 = np.percentile(latencies, [50, 99])
+            print(f"  {priority:<12} n={len(latencies):<5} p50={p50 * 1000:7.1f}ms p99={p99 * 1000:7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--think-time", type=float, default=0.1)
+    parser.add_argument("--summarizers", type=int, default=4)
+    parser.add_argument("--chunks", type=int, default=40)
+    parser.add_argument("--map-concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    parser.add_argument("--rpm", type=int, default=6000)
+    parser.add_argument("--tpm", type=int, default=10_000_000)
+    parser.add_argument("--max-queue", type=int, default=1024)
+    args = parser.parse_args()
+
+    results, rejected, elapsed, _ = run(args, scheduled=False)
+    report("unscheduled", results, rejected, elapsed)
+    results, rejected, elapsed, scheduler = run(args, scheduled=True)
+    report("scheduled", results, rejected, elapsed)
+    print(f"  scheduler: {scheduler.snapshot()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Compares the sequential and concurrent map step of the detailed summary.
+
+    python -m benchmarks.bench_summarization --latency 0.5 --chunks 10
+"""
+import argparse
+import time
+
+from benchmarks.fakes import FakeChatModel
+from summarization_chain import build_full_summarization_chain
+
+
+def synthetic_transcript(num_chunks, chunk_size):
+    sentence = "this is a synthetic transcript sentence number {} about the video topic. "
+    text = ""
+    i = 0
+    while len(text) < num_chunks * chunk_size:
+        text += sentence.format(i)
+        i += 1
+    return text
+
+
+def run(max_concurrency, transcript, chunk_size, latency):
+    model = FakeChatModel(latency=latency)
+    chain = build_full_summarization_chain(model, chunk_size=chunk_size, chunk_overlap=0,
+                                           max_concurrency=max_concurrency)
+    start = time.perf_counter()
+    chain.invoke(transcript)
+    return time.perf_counter() - start, model.calls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--chunks", type=int, default=10)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    transcript = synthetic_transcript(args.chunks, args.chunk_size)
+    sequential, calls = run(1, transcript, args.chunk_size, args.latency)
+    concurrent, _ = run(args.concurrency, transcript, args.chunk_size, args.latency)
+
+    print(f"LLM calls:               {calls}")
+    print(f"sequential (1 worker):   {sequential:.2f}s")
+    print(f"concurrent ({args.concurrency} workers):  {concurrent:.2f}s")
+    print(f"speedup:                 {sequential / concurrent:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+import time
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from utils.embeddings import HashingEmbeddings
+
+# The map step calls fakes from several threads; keep call counts exact
+_calls_lock = threading.Lock()
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Offline chat model that sleeps for `latency` seconds per call and
+    echoes the last `response_words` words of the prompt back.
+    """
+
+    latency: float = 0.0
+    response_words: int = 30
+    calls: int = 0
+
+    @property
+    def _llm_type(self):
+        return "fake-chat"
+
+    def _respond(self, messages):
+        with _calls_lock:
+            self.calls += 1
+        words = " ".join(str(m.content) for m in messages).split()
+        text = " ".join(words[-self.response_words:])
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency)
+        return self._respond(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        return self._respond(messages)
+
+
+class FakeEmbeddings(HashingEmbeddings):
+    """
+    Offline embeddings that sleep for `latency` seconds per batch, standing in
+    for a remote embedding API.
+    """
+
+    def __init__(self, latency=0.0, dimension=256, batch_size=100):
+        super().__init__(dimension=dimension, batch_size=batch_size)
+        self.latency = latency
+        self.calls = 0
+
+    @property
+    def model_name(self):
+        return f"fake-{self.dimension}"
+
+    def _embed_batch(self, texts):
+        with _calls_lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return super()._embed_batch(texts)
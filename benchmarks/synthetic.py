@@ -0,0 +1,26 @@
+import random
+
+WORDS = (
+    "so today we talk about the main idea behind this project and why it matters for teams "
+    "that build software every day the budget the schedule the people and the tools all "
+    "change over time and we will look at numbers examples and stories from real companies"
+).split()
+TOPICS = ["pricing", "hiring", "databases", "caching", "testing", "deployment", "security", "design"]
+
+
+def synthetic_transcript_list(minutes, seed=0, segment_seconds=3.0, words_per_segment=8):
+    """
+    Returns a transcript in the YouTubeTranscriptApi segment format
+    ({"text", "start", "duration"}), with a topic word sprinkled in so
+    different parts of the video are distinguishable.
+    """
+    rng = random.Random(seed)
+    segments = []
+    start = 0.0
+    while start < minutes * 60:
+        topic = TOPICS[int(start // 300) % len(TOPICS)]
+        words = [rng.choice(WORDS) for _ in range(words_per_segment - 1)] + [topic]
+        rng.shuffle(words)
+        segments.append({"text": " ".join(words), "start": round(start, 2), "duration": segment_seconds})
+        start += segment_seconds
+    return segments
@@ -1,24 +1,15 @@
 # chatbot.py
 
-from dotenv import load_dotenv
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
 from langchain_community.vectorstores import FAISS
 from langchain_core.prompts import PromptTemplate
 from langchain_core.runnables import RunnableParallel, RunnablePassthrough, RunnableLambda
 from langchain_core.output_parsers import StrOutputParser
-import re
 from urllib.parse import urlparse, parse_qs
 from summarization_chain import build_full_summarization_chain
-
-from langchain.retrievers import ContextualCompressionRetriever
-from langchain.retrievers.document_compressors import LLMChainExtractor
-load_dotenv()
-
-embedding = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
-model = ChatGoogleGenerativeAI(model='models/gemini-1.5-flash')
+from utils.providers import get_chat_model, get_embedding
 
 def extract_video_id(url_or_id):
     """
@@ -88,7 +79,7 @@ def split_text(transcript,chunk_size=1200,chunk_overlap=200):
 
 
 def create_vectorstore(chunks):
-    return FAISS.from_documents(chunks, embedding)
+    return FAISS.from_documents(chunks, get_embedding())
 
 
 
@@ -132,6 +123,7 @@ def create_qa_chain(vector_store=None, search_type=None, summaryType=None, trans
 
     # This will be overwritten conditionally
     final_chain = None
+    model = get_chat_model()
 
     if summaryType is None:
         # Step 1: Create base retriever using the provided search_type
@@ -141,6 +133,9 @@ def create_qa_chain(vector_store=None, search_type=None, summaryType=None, trans
 
         # Step 2: Wrap retriever with compression layer if requested
         if search_type == "compression":
+            from langchain.retrievers import ContextualCompressionRetriever
+            from langchain.retrievers.document_compressors import LLMChainExtractor
+
             compressor = LLMChainExtractor.from_llm(model)
             retriever = ContextualCompressionRetriever(
                 base_compressor=compressor,
@@ -157,9 +152,8 @@ def create_qa_chain(vector_store=None, search_type=None, summaryType=None, trans
         final_chain = parallel_chain | prompt | model | parser
 
     elif summaryType == "detailed_summary":
-        num_chunks = 10
-        avg_chunk_length = len(transcript) // num_chunks
-        final_chain = build_full_summarization_chain(model, chunk_size=avg_chunk_length)
+        # Chunks are sized by token budget, so long videos get more chunks, not bigger ones
+        final_chain = build_full_summarization_chain(model)
 
     elif summaryType == "concise_summary":
         final_chain = prompt1 | model | StrOutputParser()
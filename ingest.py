@@ -0,0 +1,259 @@
+"""
+Pre-warms the vector store cache for a list of videos.
+
+    python ingest.py videos.txt --language en
+
+`videos.txt` holds one YouTube URL or video ID per line (blank lines and
+lines starting with # are ignored). Each video goes through
+
+    fetch (threads) -> split (processes) -> embed -> index + save (threads)
+
+Embedding runs on the process pool for the offline hashing backend and on
+threads for remote backends. Finished videos are appended to a JSONL manifest,
+so re-running the same command resumes where it stopped.
+
+With --corpus DIR every finished video is also added to a multi-video
+CorpusIndex saved under DIR (see utils/corpus_index.py). Videos finished by
+an earlier run but missing from the corpus are read back from the vector
+store cache, so a crashed run still fills the corpus on resume.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import numpy as np
+
+from utils.compact_vectorstore import create_compact_vectorstore
+from utils.corpus_index import CorpusIndex
+from utils.create_vectorstore import create_vectorstore
+from utils.embeddings import HashingEmbeddings
+from utils.extract_video_id import extract_video_id
+from utils.providers import get_embedding
+from utils.split_segments import split_segments
+from utils.transcript_cache import get_transcript
+from utils.vectorstore_cache import (INDEX_TYPE, embedding_model_name, has_vectorstore, load_vectorstore, make_cache_key,
+                                    save_vectorstore)
+
+STAGES = ("fetch", "split", "embed", "index")
+
+
+def read_video_ids(path):
+    video_ids = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            video_id = extract_video_id(line)
+            if video_id:
+                video_ids.append(video_id)
+            else:
+                print(f"skipping unrecognized line: {line}")
+    # Keep the file order but drop duplicates
+    return list(dict.fromkeys(video_ids))
+
+
+def read_manifest(path):
+    """
+    Returns {(video_id, language): status} for videos that don't need another attempt.
+    """
+    finished = {}
+    if not os.path.exists(path):
+        return finished
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash can leave a truncated last line
+                continue
+            if entry["status"] in ("done", "unavailable"):
+                finished[(entry["video_id"], entry["language"])] = entry["status"]
+    return finished
+
+
+def embed_chunks(embedding, chunks):
+    return embedding.embed_matrix([chunk.page_content for chunk in chunks])
+
+
+class StageStats:
+    def __init__(self):
+        self.items = dict.fromkeys(STAGES, 0)
+        self.chunks = dict.fromkeys(STAGES, 0)
+        self.busy = dict.fromkeys(STAGES, 0.0)
+
+    def record(self, stage, elapsed, chunks=0):
+        self.items[stage] += 1
+        self.chunks[stage] += chunks
+        self.busy[stage] += elapsed
+
+    def report(self, wall):
+        print(f"\n{'stage':8s} {'videos':>7s} {'chunks':>8s} {'busy s':>8s} {'videos/s':>9s} {'chunks/s':>9s}")
+        for stage in STAGES:
+            busy = self.busy[stage] or float("nan")
+            print(f"{stage:8s} {self.items[stage]:7d} {self.chunks[stage]:8d} {self.busy[stage]:8.2f} "
+                  f"{self.items[stage] / busy:9.2f} {self.chunks[stage] / busy:9.1f}")
+        print(f"\nwall {wall:.2f}s: {self.items['index'] / wall:.2f} videos/s, "
+              f"{self.chunks['index'] / wall:.1f} chunks/s end to end")
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def _cached_item(video_id, key):
+    # Chunks and vectors of a video indexed earlier, decoded from its cached vector store
+    vector_store = load_vectorstore(key, get_embedding())
+    if vector_store is None:
+        return None
+    total = vector_store.index.ntotal
+    vectors = vector_store.index.reconstruct_n(0, total)
+    chunks = [vector_store.docstore.search(vector_store.index_to_docstore_id[i]) for i in range(total)]
+    return video_id, chunks, vectors
+
+
+def build_corpus(items, language, path, index_type="flat", cached_keys=None):
+    """
+    Adds (video_id, chunks, vectors) items to the corpus at `path`, creating it if needed.
+    `cached_keys` maps finished video ids to their vector store cache keys; those not
+    yet in the corpus are added from the cache.
+    """
+    corpus = None
+    if os.path.exists(os.path.join(path, "corpus.pkl")):
+        corpus = CorpusIndex.load(path, get_embedding())
+
+    in_corpus = set(corpus.counts) if corpus is not None else set()
+    in_corpus.update((video_id, language) for video_id, _, _ in items)
+    for video_id, key in (cached_keys or {}).items():
+        if (video_id, language) not in in_corpus:
+            item = _cached_item(video_id, key)
+            if item is not None:
+                items.append(item)
+    if not items:
+        return corpus
+
+    if corpus is None:
+        corpus = CorpusIndex(items[0][2].shape[1], index_type=index_type, embedding_function=get_embedding())
+        # IVF needs vectors from the whole batch to train its coarse quantizer
+        corpus.train(np.vstack([vectors for _, _, vectors in items]))
+    for video_id, chunks, vectors in items:
+        corpus.add_video(video_id, language, chunks, vectors)
+    corpus.save(path)
+    print(f"corpus {path}: {len(corpus)} chunks from {len(corpus.counts)} videos ({corpus.index_type})")
+    return corpus
+
+
+def ingest(video_ids, language, manifest_path, chunk_size=1200, chunk_overlap=200,
+           io_workers=8, cpu_workers=None, corpus_path=None, index_type="flat",
+           vectorstore_index_type=INDEX_TYPE):
+    embedding = get_embedding()
+    embed_in_processes = isinstance(embedding, HashingEmbeddings)
+    finished = read_manifest(manifest_path)
+    stats = StageStats()
+    corpus_items = []
+    done = {video_id for (video_id, lang), status in finished.items() if lang == language and status == "done"}
+    transcripts = {}
+    start = time.perf_counter()
+
+    def key_for(video_id):
+        return make_cache_key(video_id, language, chunk_size, chunk_overlap, embedding_model_name(embedding),
+                              "segments", vectorstore_index_type)
+
+    def index(video_id, chunks, vectors):
+        transcript = transcripts.pop(video_id)
+        if vectorstore_index_type == "flat":
+            vector_store = create_vectorstore(chunks, embedding, vectors=vectors)
+        else:
+            vector_store = create_compact_vectorstore(chunks, transcript, embedding, vectorstore_index_type,
+                                                      video_id=video_id, vectors=vectors)
+        save_vectorstore(key_for(video_id), vector_store)
+
+    with ThreadPoolExecutor(max_workers=io_workers) as threads, \
+            ProcessPoolExecutor(max_workers=cpu_workers) as processes, \
+            open(manifest_path, "a", encoding="utf-8") as manifest:
+
+        def log(video_id, status, chunks=0, error=None):
+            manifest.write(json.dumps({"video_id": video_id, "language": language, "status": status,
+                                       "chunks": chunks, "error": error}) + "\n")
+            manifest.flush()
+            if status == "done":
+                done.add(video_id)
+            print(f"{status:12s} {video_id} {error or ''}")
+
+        pending = {}
+        for video_id in video_ids:
+            if (video_id, language) in finished:
+                continue
+            if has_vectorstore(key_for(video_id)):
+                log(video_id, "done")
+                continue
+            pending[threads.submit(_timed, get_transcript, video_id, language)] = ("fetch", video_id, None)
+
+        while pending:
+            completed, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in completed:
+                stage, video_id, chunks = pending.pop(future)
+                try:
+                    result, elapsed = future.result()
+                except Exception as e:
+                    log(video_id, "failed", error=f"{stage}: {e}")
+                    continue
+
+                if stage == "fetch":
+                    stats.record("fetch", elapsed)
+                    transcript, transcript_list = result
+                    if isinstance(transcript, str) and not transcript_list:
+                        log(video_id, "unavailable", error=transcript)
+                        continue
+                    transcripts[video_id] = transcript
+                    next_future = processes.submit(_timed, split_segments, transcript_list,
+                                                   chunk_size, chunk_overlap, video_id)
+                    pending[next_future] = ("split", video_id, None)
+
+                elif stage == "split":
+                    stats.record("split", elapsed, len(result))
+                    pool = processes if embed_in_processes else threads
+                    pending[pool.submit(_timed, embed_chunks, embedding, result)] = ("embed", video_id, result)
+
+                elif stage == "embed":
+                    stats.record("embed", elapsed, len(chunks))
+                    pending[threads.submit(_timed, index, video_id, chunks, result)] = ("index", video_id, chunks)
+                    if corpus_path:
+                        corpus_items.append((video_id, chunks, result))
+
+                elif stage == "index":
+                    stats.record("index", elapsed, len(chunks))
+                    log(video_id, "done", chunks=len(chunks))
+
+    stats.report(time.perf_counter() - start)
+    if corpus_path:
+        # Also picks up videos finished by a crashed run or skipped via the cache
+        build_corpus(corpus_items, language, corpus_path, index_type,
+                     cached_keys={video_id: key_for(video_id) for video_id in video_ids if video_id in done})
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("videos", help="file with one YouTube URL or video ID per line")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--manifest", default="ingest_manifest.jsonl")
+    parser.add_argument("--chunk-size", type=int, default=1200)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--io-workers", type=int, default=8)
+    parser.add_argument("--cpu-workers", type=int, default=None)
+    parser.add_argument("--corpus", default=None, help="directory of a multi-video corpus index to add to")
+    parser.add_argument("--index-type", choices=("flat", "ivf", "hnsw"), default="flat")
+    args = parser.parse_args()
+
+    ingest(read_video_ids(args.videos), args.language, args.manifest, chunk_size=args.chunk_size,
+           chunk_overlap=args.chunk_overlap, io_workers=args.io_workers, cpu_workers=args.cpu_workers,
+           corpus_path=args.corpus, index_type=args.index_type)
+
+
+if __name__ == "__main__":
+    main()
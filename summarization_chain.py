@@ -1,8 +1,30 @@
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from google.api_core.exceptions import ResourceExhausted
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from langchain_core.rate_limiters import InMemoryRateLimiter
 from langchain_core.runnables import RunnableLambda, RunnableSequence
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
+from utils import metrics
+from utils.estimate_tokens import CHARS_PER_TOKEN, estimate_tokens
+
+# Errors worth retrying in the map step: quota (429) and per-chunk timeouts
+RETRYABLE_ERRORS = (ResourceExhausted, TimeoutError)
+
+# Concise summary routing thresholds, in estimated tokens
+CONCISE_DIRECT_TOKENS = int(os.getenv("CONCISE_DIRECT_TOKENS", 30000))
+CONCISE_EXTRACTIVE_TOKENS = int(os.getenv("CONCISE_EXTRACTIVE_TOKENS", 200000))
+
+logger = logging.getLogger("ytchat.summarization")
+
 # You'll pass the same model instance you use for QA
 
 def get_chunk_summarization_chain(model):
@@ -20,33 +42,240 @@ def get_chunk_summarization_chain(model):
 
     return prompt | model | StrOutputParser()
 
-def get_final_summary_chain(model):
+def get_final_summary_chain(model, language=None):
     prompt = PromptTemplate(
         template="""
         These are partial summaries of different segments of a long YouTube transcript.
-        Write a single unified and concise summary based on them.
+        Write a single unified and concise summary based on them.{language_instruction}
 
         ---
         {partial_summaries}
         """,
-        input_variables=["partial_summaries"]
+        input_variables=["partial_summaries"],
+        partial_variables={"language_instruction": f"\n        Write the summary in {language}." if language else ""}
     )
 
     return prompt | model | StrOutputParser()
 
-def build_full_summarization_chain(model, chunk_size=1000, chunk_overlap=200):
+def with_rate_limit(runnable, requests_per_second=None):
+    """
+    Makes every call to the runnable wait for a slot in a shared token bucket.
+    """
+    if not requests_per_second:
+        return runnable
+
+    limiter = InMemoryRateLimiter(requests_per_second=requests_per_second, max_bucket_size=1)
+
+    def invoke(inputs):
+        limiter.acquire()
+        return runnable.invoke(inputs)
+
+    async def ainvoke(inputs):
+        await limiter.aacquire()
+        return await runnable.ainvoke(inputs)
+
+    return RunnableLambda(invoke, afunc=ainvoke)
+
+
+def with_timeout(runnable, timeout=None, max_abandoned=256):
+    """
+    Raises TimeoutError when a single call takes longer than `timeout` seconds.
+
+    A sync call runs on a worker thread, which can't be stopped once it times
+    out. The call is kept, finished or not, until a retry with the same input
+    picks it up, so a retry after the backoff reuses a late result instead of
+    sending a new request. At most `max_abandoned` unclaimed calls are kept.
+    """
+    if not timeout:
+        return runnable
+
+    # id(inputs) -> (inputs, future); holding `inputs` keeps its id from being reused
+    abandoned = OrderedDict()
+    lock = threading.Lock()
+
+    def invoke(inputs, config):
+        key = id(inputs)
+        with lock:
+            pending = abandoned.pop(key, None)
+            if pending is None or pending[0] is not inputs:
+                executor = ThreadPoolExecutor(max_workers=1)
+                # Run in a copy of the caller's context and with its config, so callbacks
+                # and metadata (e.g. the scheduler's session_id) follow the call
+                future = executor.submit(contextvars.copy_context().run, runnable.invoke, inputs, config)
+                # Don't block on a call that may time out
+                executor.shutdown(wait=False)
+                pending = (inputs, future)
+        try:
+            return pending[1].result(timeout=timeout)
+        except FutureTimeoutError:
+            with lock:
+                abandoned[key] = pending
+                while len(abandoned) > max_abandoned:
+                    abandoned.popitem(last=False)
+            raise TimeoutError(f"call took longer than {timeout}s") from None
+
+    async def ainvoke(inputs, config):
+        # Cancelling the coroutine cancels the request, so nothing keeps running here
+        return await asyncio.wait_for(runnable.ainvoke(inputs, config), timeout)
+
+    return RunnableLambda(invoke, afunc=ainvoke)
+
+
+def group_by_budget(texts, max_tokens):
+    """
+    Greedily packs consecutive texts into groups that fit in max_tokens.
+    Every group holds at least two texts so each reduce level shrinks the list.
+    """
+    groups, current, current_tokens = [], [], 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if len(current) >= 2 and current_tokens + tokens > max_tokens:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        if len(current) == 1 and groups:
+            groups[-1].append(current[0])
+        else:
+            groups.append(current)
+    return groups
+
+
+class MapReduceSummarizer:
+    """
+    Map-reduce summary of a transcript.
+
+    Chunks are sized to `chunk_tokens` (or `chunk_size` characters if given). Partial
+    summaries that don't fit in `reduce_tokens` are reduced as a tree: each level
+    summarizes budget-sized groups in parallel, so depth grows with log(n).
+    """
+
+    def __init__(self, model, chunk_size=None, chunk_overlap=200, chunk_tokens=2000, reduce_tokens=8000,
+                 max_concurrency=4, requests_per_second=None, chunk_timeout=None, max_retries=3,
+                 callbacks=None, session_id=None, language=None):
+        if chunk_size is None:
+            chunk_size = chunk_tokens * CHARS_PER_TOKEN
+        chunk_overlap = min(chunk_overlap, chunk_size // 2)
+
+        self.model = model
+        self.language = language
+        self.reduce_tokens = reduce_tokens
+        self.splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        self.batch_config = {"max_concurrency": max_concurrency}
+        if callbacks:
+            self.batch_config["callbacks"] = callbacks
+        if session_id:
+            # Lets the LLM scheduler share capacity fairly between sessions
+            self.batch_config["metadata"] = {"session_id": session_id}
+
+        def resilient(chain):
+            # The limiter sits outside the timeout so waiting for a slot doesn't count against it
+            return with_rate_limit(with_timeout(chain, chunk_timeout), requests_per_second).with_retry(
+                retry_if_exception_type=RETRYABLE_ERRORS,
+                wait_exponential_jitter=True,
+                stop_after_attempt=max_retries
+            )
+
+        self.chunk_summarizer = resilient(get_chunk_summarization_chain(model))
+        self.reducer = resilient(get_final_summary_chain(model, language))
+
     # Step 1: Split transcript to chunks
-    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-    split_chunks = RunnableLambda(lambda transcript: splitter.create_documents([transcript]))
+    def split(self, transcript):
+        return [{"chunk": doc.page_content} for doc in self.splitter.create_documents([transcript])]
+
+    # Step 2: Summarize chunks concurrently; batch keeps outputs in input order
+    def map(self, chunks):
+        return self.chunk_summarizer.batch(chunks, config=self.batch_config)
+
+    async def amap(self, chunks):
+        return await self.chunk_summarizer.abatch(chunks, config=self.batch_config)
+
+    # Step 3: Reduce partials level by level until they fit in one prompt
+    def _fits(self, partials):
+        return len(partials) <= 1 or estimate_tokens("\n\n".join(partials)) <= self.reduce_tokens
+
+    def _reduce_inputs(self, partials):
+        return [{"partial_summaries": "\n\n".join(group)} for group in group_by_budget(partials, self.reduce_tokens)]
+
+    def reduce_levels(self, partials):
+        while not self._fits(partials):
+            partials = self.reducer.batch(self._reduce_inputs(partials), config=self.batch_config)
+        return {"partial_summaries": "\n\n".join(partials)}
+
+    async def areduce_levels(self, partials):
+        while not self._fits(partials):
+            partials = await self.reducer.abatch(self._reduce_inputs(partials), config=self.batch_config)
+        return {"partial_summaries": "\n\n".join(partials)}
+
+    def as_chain(self):
+        return (
+            RunnableLambda(self.split)
+            | RunnableLambda(self.map, afunc=self.amap)
+            | RunnableLambda(self.reduce_levels, afunc=self.areduce_levels)
+            | self.reducer
+        )
+
+    def stream(self, transcript, on_partial=None):
+        """
+        Yields the final summary token by token.
+
+        `on_partial(index, summary)` is called from the caller's thread as each
+        chunk summary finishes, so a UI can show progress during the map step.
+        """
+        chunks = self.split(transcript)
+        partials = [None] * len(chunks)
+        for index, summary in self.chunk_summarizer.batch_as_completed(chunks, config=self.batch_config):
+            partials[index] = summary
+            if on_partial is not None:
+                on_partial(index, summary)
+
+        # Only the last reduce node streams; retries would replay already shown tokens
+        final_config = {key: value for key, value in self.batch_config.items() if key != "max_concurrency"}
+        yield from get_final_summary_chain(self.model, self.language).stream(self.reduce_levels(partials),
+                                                              config=final_config or None)
+
+
+def build_full_summarization_chain(model, **kwargs):
+    return MapReduceSummarizer(model, **kwargs).as_chain()
+
+
+def stream_full_summarization(model, transcript, on_partial=None, **kwargs):
+    return MapReduceSummarizer(model, **kwargs).stream(transcript, on_partial=on_partial)
+
+
+def build_concise_summary_chain(model, prompt, direct_tokens=CONCISE_DIRECT_TOKENS,
+                                extractive_tokens=CONCISE_EXTRACTIVE_TOKENS, **map_reduce_kwargs):
+    """
+    Routes a concise summary by transcript size.
+
+    Up to `direct_tokens` the whole transcript goes in one prompt. Up to
+    `extractive_tokens` a local extractive pre-pass shrinks it to `direct_tokens`
+    first. Anything longer goes through the map-reduce summarizer.
+    """
+    from utils.extractive_summary import select_sentences
+
+    single_prompt = prompt | model | StrOutputParser()
+
+    def map_reduce(inputs):
+        # Built per call so the reduce prompt answers in the requested language
+        return RunnableLambda(lambda inputs: inputs["transcript"]) | build_full_summarization_chain(
+            model, language=inputs.get("language"), **map_reduce_kwargs
+        )
 
-    # Step 2: Summarize each chunk
-    chunk_summarizer = get_chunk_summarization_chain(model)
-    summarize_chunks = RunnableLambda(lambda docs: [chunk_summarizer.invoke({"chunk": doc.page_content}) for doc in docs])
+    def shrink(inputs):
+        return {**inputs, "transcript": select_sentences(inputs["transcript"], direct_tokens)}
 
-    # Step 3: Combine partials and summarize them
-    combine_summaries = RunnableLambda(
-        lambda partials: {"partial_summaries": "\n\n".join(partials)}
-    ) 
+    def route(inputs):
+        tokens = estimate_tokens(inputs["transcript"])
+        if tokens <= direct_tokens:
+            route_name, chain = "direct", single_prompt
+        elif tokens <= extractive_tokens:
+            route_name, chain = "extractive", RunnableLambda(shrink) | single_prompt
+        else:
+            route_name, chain = "map_reduce", map_reduce(inputs)
+        logger.info("concise summary route=%s transcript_tokens=%d", route_name, tokens)
+        metrics.count(f"concise_route_{route_name}")
+        return chain
 
-    # Full chain
-    return split_chunks | summarize_chunks | combine_summaries
+    return RunnableLambda(route)
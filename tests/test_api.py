@@ -0,0 +1,98 @@
+import asyncio
+import functools
+import threading
+import time
+
+import httpx
+import pytest
+
+import api
+from benchmarks.fakes import FakeChatModel
+from benchmarks.synthetic import synthetic_transcript_list
+from utils import providers, video_pipeline
+from utils.embeddings import HashingEmbeddings
+from utils.vectorstore_cache import get_or_create_vectorstore
+
+
+class StubTranscriptSource:
+    def __init__(self, minutes=5, latency=0.05):
+        self.segments = synthetic_transcript_list(minutes)
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, video_id, language):
+        with self._lock:
+            self.calls += 1
+        # Slow enough that concurrent requests overlap with the fetch
+        time.sleep(self.latency)
+        return " ".join(segment["text"] for segment in self.segments), self.segments
+
+
+@pytest.fixture
+def offline(monkeypatch, tmp_path):
+    embedding = HashingEmbeddings(dimension=256)
+    chat_model = FakeChatModel()
+    monkeypatch.setitem(providers._clients, "embedding", embedding)
+    monkeypatch.setitem(providers._clients, "chat_model", chat_model)
+    monkeypatch.setitem(providers._clients, "cached_chat_model", chat_model)
+    monkeypatch.setitem(providers._clients, "cached_interactive_chat_model", chat_model)
+    monkeypatch.setattr(video_pipeline, "get_or_create_vectorstore",
+                        functools.partial(get_or_create_vectorstore, cache_dir=str(tmp_path / "vectorstores")))
+    return chat_model
+
+
+def post_concurrently(app, path, payloads):
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.post(path, json=payload) for payload in payloads))
+
+    return asyncio.run(run())
+
+
+def test_concurrent_questions_share_one_transcript_fetch_and_index_build(offline):
+    source = StubTranscriptSource()
+    app = api.create_app(transcript_source=source)
+    payloads = [
+        {"video": "dQw4w9WgXcQ", "language": "en", "question": f"what about caching {i}?",
+         "search_type": "similarity", "use_cache": False}
+        for i in range(8)
+    ]
+
+    responses = post_concurrently(app, "/qa", payloads)
+
+    assert [response.status_code for response in responses] == [200] * len(payloads)
+    assert all(response.json()["answer"] for response in responses)
+    registry = app.state.registry
+    assert source.calls == 1
+    assert registry.build_counts["transcript"] == 1
+    assert registry.build_counts["index"] == 1
+    assert registry.build_counts["qa:similarity"] == 1
+    assert registry.single_flight.stats["coalesced"] > 0
+    assert offline.calls == len(payloads)
+
+
+def test_missing_transcript_is_a_404(offline):
+    app = api.create_app(transcript_source=lambda video_id, language: ("No transcript found.", []))
+
+    (response,) = post_concurrently(app, "/summary/concise", [{"video": "dQw4w9WgXcQ", "language": "en"}])
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "No transcript found."
+
+
+def test_cached_answer_skips_transcript_and_index(offline):
+    source = StubTranscriptSource()
+    app = api.create_app(transcript_source=source)
+    pipeline = app.state.registry.pipeline("cachedVid01", "en")
+    _, question_vector = pipeline.cached_answer("what about caching?", "mmr")
+    pipeline.remember_answer("mmr", question_vector, "It is about caching.")
+
+    (response,) = post_concurrently(app, "/qa", [
+        {"video": "cachedVid01", "language": "en", "question": "what about caching?"}
+    ])
+
+    assert response.json() == {"video_id": "cachedVid01", "answer": "It is about caching.", "cached": True}
+    assert source.calls == 0
+    assert not app.state.registry.build_counts
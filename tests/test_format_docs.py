@@ -0,0 +1,23 @@
+from langchain_core.documents import Document
+
+from utils.estimate_tokens import estimate_tokens
+from utils.format_docs import format_docs
+
+
+def _chunk(index, size=400):
+    text = f"{index:03d}" + "x" * (size - 3)
+    return Document(page_content=text, metadata={"start_index": index * 1000, "start": index * 60.0})
+
+
+def test_budget_counts_timestamps_and_separators():
+    docs = [_chunk(i) for i in range(6)]
+    for max_tokens in (50, 100, 250, 400):
+        context = format_docs(docs, max_tokens=max_tokens)
+        assert estimate_tokens(context) <= max_tokens
+        assert context.startswith("[t=00:00] 000")
+
+
+def test_unbudgeted_context_keeps_every_chunk_in_order():
+    docs = [_chunk(i) for i in (3, 0, 5)]
+    context = format_docs(docs, max_tokens=None)
+    assert [passage[:9] for passage in context.split("\n\n")] == ["[t=00:00]", "[t=03:00]", "[t=05:00]"]
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+import ingest
+from benchmarks.synthetic import synthetic_transcript_list
+from utils import providers
+from utils.corpus_index import CorpusIndex
+from utils.embeddings import HashingEmbeddings
+
+VIDEOS = ["videoAAAAAA", "videoBBBBBB", "videoCCCCCC"]
+UNAVAILABLE = "videoDDDDDD"
+
+
+def stub_transcript(video_id, language):
+    if video_id == UNAVAILABLE:
+        return "Transcripts are disabled for this video.", []
+    segments = synthetic_transcript_list(5, seed=sum(map(ord, video_id)))
+    return " ".join(segment["text"] for segment in segments), segments
+
+
+@pytest.fixture
+def offline(monkeypatch, tmp_path):
+    # The vector store cache lives under ./.cache, so run inside tmp_path
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(providers._clients, "embedding", HashingEmbeddings(dimension=64))
+    monkeypatch.setattr(ingest, "get_transcript", stub_transcript)
+    return tmp_path
+
+
+def read_statuses(path):
+    with open(path, encoding="utf-8") as f:
+        return [(entry["video_id"], entry["status"]) for entry in map(json.loads, f)]
+
+
+def test_resume_adds_videos_from_earlier_runs_to_the_corpus(offline):
+    manifest = str(offline / "manifest.jsonl")
+    corpus_path = str(offline / "corpus")
+
+    ingest.ingest(VIDEOS[:2] + [UNAVAILABLE], "en", manifest, io_workers=2, cpu_workers=1,
+                  vectorstore_index_type="flat")
+    assert sorted(read_statuses(manifest)) == sorted(
+        [(VIDEOS[0], "done"), (VIDEOS[1], "done"), (UNAVAILABLE, "unavailable")]
+    )
+
+    # The resumed run skips finished videos but still puts them in the corpus
+    ingest.ingest(VIDEOS + [UNAVAILABLE], "en", manifest, io_workers=2, cpu_workers=1,
+                  corpus_path=corpus_path, vectorstore_index_type="flat")
+    statuses = read_statuses(manifest)
+    assert statuses.count((VIDEOS[2], "done")) == 1
+    assert len(statuses) == 4
+
+    corpus = CorpusIndex.load(corpus_path, providers.get_embedding())
+    assert set(corpus.counts) == {(video_id, "en") for video_id in VIDEOS}
+    assert all(count > 0 for count in corpus.counts.values())
+    assert len(corpus) == sum(corpus.counts.values())
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from utils.llm_scheduler import LLMScheduler, SchedulerOverloaded
+
+
+@pytest.fixture
+def scheduler():
+    # One slot and no rate limit, so admission order is decided by the queue alone
+    return LLMScheduler(max_concurrency=1, requests_per_minute=10 ** 6, tokens_per_minute=10 ** 9, max_queue=8)
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def queue_in_order(scheduler, requests):
+    """
+    Starts one thread per (priority, session, name) while the only slot is held,
+    each enqueued after the previous one, and returns the order they were served in.
+    """
+    served = []
+    threads = []
+    scheduler.acquire()
+    for priority, session, name in requests:
+        def run(priority=priority, session=session, name=name):
+            with scheduler.slot(priority, session):
+                served.append(name)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        threads.append(thread)
+        wait_until(lambda: scheduler.snapshot()["queued"] == len(threads))
+    scheduler.release()
+    for thread in threads:
+        thread.join(2)
+    return served
+
+
+def test_higher_priority_is_served_first(scheduler):
+    served = queue_in_order(scheduler, [
+        ("background", None, "background"),
+        ("summary", None, "summary"),
+        ("interactive", None, "interactive"),
+    ])
+    assert served == ["interactive", "summary", "background"]
+
+
+def test_sessions_take_turns_within_a_priority(scheduler):
+    served = queue_in_order(scheduler, [
+        ("summary", "a", "a1"),
+        ("summary", "a", "a2"),
+        ("summary", "a", "a3"),
+        ("summary", "b", "b1"),
+    ])
+    assert served == ["a1", "b1", "a2", "a3"]
+
+
+def test_full_queue_raises_overloaded():
+    scheduler = LLMScheduler(max_concurrency=1, max_queue=1)
+    scheduler.acquire()
+    waiter = threading.Thread(target=lambda: (scheduler.acquire(), scheduler.release()))
+    waiter.start()
+    wait_until(lambda: scheduler.snapshot()["queued"] == 1)
+
+    with pytest.raises(SchedulerOverloaded):
+        scheduler.acquire()
+    assert scheduler.snapshot()["rejected"] == 1
+
+    scheduler.release()
+    waiter.join(2)
+    assert scheduler.snapshot()["in_flight"] == 0
+
+
+def test_timed_out_ticket_leaves_the_queue(scheduler):
+    scheduler.acquire()
+    with pytest.raises(TimeoutError):
+        scheduler.acquire(timeout=0.05)
+    assert scheduler.snapshot()["queued"] == 0
+
+    scheduler.release()
+    # The abandoned ticket must not have taken the freed slot
+    with scheduler.slot(timeout=1):
+        assert scheduler.snapshot()["in_flight"] == 1
+    assert scheduler.snapshot()["in_flight"] == 0
+
+
+def test_cancelled_coroutine_gives_up_its_ticket(scheduler):
+    async def run():
+        scheduler.acquire()
+        task = asyncio.create_task(scheduler.aacquire())
+        await asyncio.sleep(0.05)
+        assert scheduler.snapshot()["queued"] == 1
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert scheduler.snapshot()["queued"] == 0
+
+        scheduler.release()
+        async with scheduler.aslot(timeout=1):
+            assert scheduler.snapshot()["in_flight"] == 1
+
+    asyncio.run(run())
+    assert scheduler.snapshot()["in_flight"] == 0
+
+
+def test_cancelled_after_admission_releases_the_slot(scheduler):
+    async def run():
+        task = asyncio.create_task(scheduler.aacquire())
+        # Admitted synchronously on enqueue, then cancelled before the coroutine resumes
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert scheduler.snapshot()["admitted"] == 1
+    assert scheduler.snapshot()["in_flight"] == 0
@@ -0,0 +1,35 @@
+from langchain_core.runnables import RunnableLambda
+
+from benchmarks.fakes import FakeChatModel
+from summarization_chain import MapReduceSummarizer, with_timeout
+
+
+def transcript(words):
+    return " ".join(f"word{i}" for i in range(words))
+
+
+def test_late_results_are_reused_by_the_retry():
+    # Each call overruns the timeout a little; the retry after the backoff must pick up
+    # the finished call instead of sending the chunk again
+    model = FakeChatModel(latency=0.3)
+    summarizer = MapReduceSummarizer(model, chunk_size=400, chunk_overlap=0, max_concurrency=8,
+                                     chunk_timeout=0.2, max_retries=3)
+    chunks = summarizer.split(transcript(300))
+    assert len(chunks) > 3
+
+    partials = summarizer.map(chunks)
+
+    assert len(partials) == len(chunks)
+    assert model.calls == len(chunks)
+
+
+def test_timeout_keeps_the_caller_config():
+    seen = []
+
+    def record(inputs, config):
+        seen.append(config["metadata"].get("session_id"))
+        return inputs
+
+    chain = with_timeout(RunnableLambda(record), 1.0)
+    assert chain.invoke({"chunk": "a"}, config={"metadata": {"session_id": "s1"}}) == {"chunk": "a"}
+    assert seen == ["s1"]
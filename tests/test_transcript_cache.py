@@ -0,0 +1,112 @@
+import pytest
+from youtube_transcript_api._errors import NoTranscriptFound, TranscriptsDisabled
+
+from utils.transcript_cache import DISABLED_MESSAGE, NOT_FOUND_MESSAGE, TranscriptCache
+
+SEGMENTS = [{"text": "hello", "start": 0.0, "duration": 1.0}, {"text": "world", "start": 1.0, "duration": 1.0}]
+
+
+class StubFetcher:
+    """
+    Stands in for YouTube: returns SEGMENTS, or raises whatever `errors` holds for a video.
+    """
+
+    def __init__(self, errors=None):
+        self.errors = errors or {}
+        self.calls = []
+
+    def __call__(self, video_id, language):
+        self.calls.append((video_id, language))
+        error = self.errors.get(video_id)
+        if error is not None:
+            raise error
+        return SEGMENTS
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def make_cache(fetcher, clock, tmp_path, **kwargs):
+    return TranscriptCache(fetcher=fetcher, lister=lambda video_id: [], db_path=str(tmp_path / "transcripts.db"),
+                           ttl=100, negative_ttl=10, clock=clock, **kwargs)
+
+
+def test_hit_returns_the_cached_transcript(clock, tmp_path):
+    fetcher = StubFetcher()
+    cache = make_cache(fetcher, clock, tmp_path)
+    assert cache.get_transcript("v1", "en") == ("hello world", SEGMENTS)
+    assert cache.get_transcript("v1", "en") == ("hello world", SEGMENTS)
+    assert len(fetcher.calls) == 1
+    assert cache.stats["memory_hits"] == 1
+
+
+@pytest.mark.parametrize("error, message", [
+    (TranscriptsDisabled("v1"), DISABLED_MESSAGE),
+    (NoTranscriptFound("v1", ["en"], []), NOT_FOUND_MESSAGE),
+])
+def test_missing_transcripts_are_cached_for_negative_ttl(clock, tmp_path, error, message):
+    fetcher = StubFetcher({"v1": error})
+    cache = make_cache(fetcher, clock, tmp_path)
+    assert cache.get_transcript("v1", "en") == (message, [])
+
+    clock.now += 9
+    assert cache.get_transcript("v1", "en") == (message, [])
+    assert len(fetcher.calls) == 1
+    assert cache.stats["negative_hits"] == 1
+
+    # Past negative_ttl YouTube is asked again
+    clock.now += 2
+    cache.get_transcript("v1", "en")
+    assert len(fetcher.calls) == 2
+
+
+def test_entries_expire_after_ttl(clock, tmp_path):
+    fetcher = StubFetcher()
+    cache = make_cache(fetcher, clock, tmp_path)
+    cache.get_transcript("v1", "en")
+
+    clock.now += 99
+    cache.get_transcript("v1", "en")
+    assert len(fetcher.calls) == 1
+
+    clock.now += 2
+    assert cache.get_transcript("v1", "en") == ("hello world", SEGMENTS)
+    assert len(fetcher.calls) == 2
+
+
+def test_sqlite_tier_survives_a_new_instance(clock, tmp_path):
+    make_cache(StubFetcher(), clock, tmp_path).get_transcript("v1", "en")
+
+    fetcher = StubFetcher()
+    cache = make_cache(fetcher, clock, tmp_path)
+    assert cache.get_transcript("v1", "en") == ("hello world", SEGMENTS)
+    assert fetcher.calls == []
+    assert cache.stats["disk_hits"] == 1
+
+    # Expired rows on disk are refetched, not served
+    clock.now += 101
+    make_cache(fetcher, clock, tmp_path).get_transcript("v1", "en")
+    assert len(fetcher.calls) == 1
+
+
+def test_transient_errors_are_not_cached(clock, tmp_path):
+    fetcher = StubFetcher({"v1": ConnectionError("rate limited")})
+    cache = make_cache(fetcher, clock, tmp_path)
+    message, segments = cache.get_transcript("v1", "en")
+    assert "rate limited" in message and segments == []
+
+    assert make_cache(StubFetcher(), clock, tmp_path)._get("transcript:v1:en") is None
+
+    del fetcher.errors["v1"]
+    assert cache.get_transcript("v1", "en") == ("hello world", SEGMENTS)
+    assert len(fetcher.calls) == 2
@@ -0,0 +1,103 @@
+import os
+
+import pytest
+
+from benchmarks.synthetic import synthetic_transcript_list
+from utils import vectorstore_cache
+from utils.embeddings import HashingEmbeddings
+from utils.vectorstore_cache import evict, get_or_create_vectorstore, load_vectorstore, make_cache_key
+
+
+@pytest.fixture
+def embedding():
+    return HashingEmbeddings(dimension=64)
+
+
+@pytest.fixture
+def transcript():
+    return " ".join(segment["text"] for segment in synthetic_transcript_list(3))
+
+
+def build(video_id, transcript, embedding, cache_dir, **kwargs):
+    return get_or_create_vectorstore(video_id, "en", transcript, chunk_size=300, chunk_overlap=50,
+                                     embedding_function=embedding, cache_dir=str(cache_dir), index_type="flat",
+                                     **kwargs)
+
+
+def entry_path(video_id, cache_dir):
+    key = make_cache_key(video_id, "en", 300, 50, "hashing-64-2", splitter="text", index_type="flat")
+    return os.path.join(str(cache_dir), key)
+
+
+def test_second_call_is_a_hit(tmp_path, transcript, embedding):
+    before = dict(vectorstore_cache.cache_stats)
+
+    first = build("video-a", transcript, embedding, tmp_path)
+    second = build("video-a", transcript, embedding, tmp_path)
+
+    assert vectorstore_cache.cache_stats["misses"] - before["misses"] == 1
+    assert vectorstore_cache.cache_stats["hits"] - before["hits"] == 1
+    assert second.index.ntotal == first.index.ntotal
+    query = "caching and deployment"
+    assert [doc.page_content for doc in second.similarity_search(query, k=3)] == \
+        [doc.page_content for doc in first.similarity_search(query, k=3)]
+
+
+def test_different_chunking_is_a_separate_entry(tmp_path, transcript, embedding):
+    build("video-a", transcript, embedding, tmp_path)
+    before = dict(vectorstore_cache.cache_stats)
+
+    get_or_create_vectorstore("video-a", "en", transcript, chunk_size=500, chunk_overlap=50,
+                              embedding_function=embedding, cache_dir=str(tmp_path), index_type="flat")
+
+    assert vectorstore_cache.cache_stats["misses"] - before["misses"] == 1
+
+
+def test_different_embedding_model_is_a_separate_entry(tmp_path, transcript, embedding):
+    build("video-a", transcript, embedding, tmp_path)
+    before = dict(vectorstore_cache.cache_stats)
+
+    other = build("video-a", transcript, HashingEmbeddings(dimension=32), tmp_path)
+
+    assert vectorstore_cache.cache_stats["misses"] - before["misses"] == 1
+    assert other.index.d == 32
+
+
+def test_eviction_drops_least_recently_used_entries(tmp_path, transcript, embedding):
+    for age, video_id in enumerate(["video-old", "video-mid", "video-new"]):
+        build(video_id, transcript, embedding, tmp_path, max_bytes=10 ** 9)
+        # Older entries get older access times
+        mtime = 1_000_000 + age * 1000
+        os.utime(entry_path(video_id, tmp_path), (mtime, mtime))
+
+    # Reading an entry makes it the most recently used
+    key = make_cache_key("video-old", "en", 300, 50, embedding.model_name, splitter="text", index_type="flat")
+    assert load_vectorstore(key, embedding, str(tmp_path)) is not None
+
+    entry_size = sum(os.path.getsize(os.path.join(entry_path("video-new", tmp_path), name))
+                     for name in os.listdir(entry_path("video-new", tmp_path)))
+    before = vectorstore_cache.cache_stats["evictions"]
+    evict(cache_dir=str(tmp_path), max_bytes=int(entry_size * 2.5))
+
+    assert os.path.exists(entry_path("video-old", tmp_path))
+    assert not os.path.exists(entry_path("video-mid", tmp_path))
+    assert os.path.exists(entry_path("video-new", tmp_path))
+    assert vectorstore_cache.cache_stats["evictions"] - before == 1
+
+
+def test_corrupt_entry_is_treated_as_a_miss_and_rebuilt(tmp_path, transcript, embedding):
+    build("video-a", transcript, embedding, tmp_path)
+    path = entry_path("video-a", tmp_path)
+    with open(os.path.join(path, "index.faiss"), "wb") as f:
+        f.write(b"not a faiss index")
+
+    key = make_cache_key("video-a", "en", 300, 50, embedding.model_name, splitter="text", index_type="flat")
+    assert load_vectorstore(key, embedding, str(tmp_path)) is None
+    assert not os.path.exists(path)
+
+    before = dict(vectorstore_cache.cache_stats)
+    rebuilt = build("video-a", transcript, embedding, tmp_path)
+
+    assert vectorstore_cache.cache_stats["misses"] - before["misses"] == 1
+    assert rebuilt.index.ntotal > 0
+    assert os.path.exists(os.path.join(path, "index.faiss"))
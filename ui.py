@@ -1,22 +1,48 @@
+import uuid
+
 import streamlit as st
 
-from utils.create_qa_chain import create_qa_chain
-from utils.get_transcript import get_transcript
-from utils.split_text import split_text
-from utils.create_vectorstore import create_vectorstore
 from utils.extract_video_id import extract_video_id
-from utils.get_transcript import list_available_transcript_languages
+from utils.format_timestamp import link_timestamps
+from utils.providers import get_cached_chat_model
+from utils.semantic_cache import answer_cache
+from utils import metrics
+from utils.timed_stream import TimedStream
+from summarization_chain import stream_full_summarization
+from utils.transcript_cache import list_available_transcript_languages
+from utils.video_pipeline import VideoPipeline
+from utils.warmup import warmups
 st.set_page_config(page_title="🎥 YouTube Transcript Assistant", layout="centered")
 st.title("🎥 YouTube Transcript Assistant")
 
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def load_pipeline(video_id, language):
+    # Shared by every session looking at the same video and language
+    return VideoPipeline(video_id, language)
+
+
+def current_pipeline(video_id, language, search_type):
+    # Reruns reuse the session's pipeline until the video, language or search type changes
+    key = (video_id, language, search_type)
+    if st.session_state.get("pipeline_key") != key:
+        st.session_state.pipeline = load_pipeline(video_id, language)
+        st.session_state.pipeline_key = key
+    return st.session_state.pipeline
+
+
+# Identifies this browser session to the LLM scheduler's fair sharing
+session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex)
+run_config = {"callbacks": metrics.callbacks(), "metadata": {"session_id": session_id}}
+
 video_input = st.text_input("Enter YouTube Video URL or ID:")
 
 # Language detection
 selected_language = None
 available_languages = []
+video_id = extract_video_id(video_input) if video_input else None
 
 if video_input:
-    video_id = extract_video_id(video_input)
     if video_id:
         lang_info = list_available_transcript_languages(video_id)
         if isinstance(lang_info, dict) and "error" in lang_info:
@@ -28,65 +54,118 @@ if video_input:
         else:
             st.warning("⚠️ No transcripts found for this video.")
 
+# Fetch and index in the background while the user picks a method and types a question
+if video_id and selected_language:
+    warmup_key = (video_id, selected_language)
+    previous_key = st.session_state.get("warmup_key")
+    if previous_key != warmup_key:
+        if previous_key:
+            warmups.cancel(*previous_key, owner=session_id)
+        st.session_state.warmup_key = warmup_key
+        warmups.start(load_pipeline(video_id, selected_language), owner=session_id)
+
 search_type = st.radio(
     "Select retrieval method for Q&A:",
-    options=["similarity", "mmr", "compression"],
+    options=["similarity", "mmr", "compression", "hybrid"],
     index=1
 )
 
 question = st.text_input("Ask a question based on the video transcript:")
+fresh_answer = st.checkbox("Always generate a fresh answer", value=False,
+                           help="Skip answers reused from similar earlier questions about this video.")
 
 col1, col2, col3 = st.columns(3)
 
 if col1.button("Get Answer"):
     with st.spinner("Processing..."):
-        video_id = extract_video_id(video_input)
         if not video_id:
             st.error("❌ Invalid YouTube URL or ID.")
         elif not selected_language:
             st.error("❌ Please select a transcript language first.")
         else:
-            transcript, transcript_list = get_transcript(video_id, selected_language)
-            if isinstance(transcript, str) and not transcript_list:
-                st.error(transcript)
+            pipeline = current_pipeline(video_id, selected_language, search_type)
+            warmups.wait(pipeline)
+            error = pipeline.load_transcript()
+            if error:
+                st.error(error)
             else:
-                chunks = split_text(transcript)
-                vector_store = create_vectorstore(chunks)
-                qa_chain = create_qa_chain(vector_store=vector_store, search_type=search_type, language=selected_language, transcript=transcript)
-                answer = qa_chain.invoke({"question": question, "language": selected_language})
+                if fresh_answer:
+                    answer_cache.bypass()
+                    answer, question_vector = None, None
+                else:
+                    answer, question_vector = pipeline.cached_answer(question, search_type)
+
                 st.success("✅ Answer:")
-                st.write(answer)
+                if answer is not None:
+                    st.markdown(link_timestamps(answer, video_id))
+                    st.caption(f"♻️ Reused an answer to a similar question · cache hit rate {answer_cache.hit_rate():.0%}")
+                else:
+                    qa_chain = pipeline.qa_chain(search_type)
+                    answer_box = st.empty()
+                    with answer_box:
+                        stream = TimedStream(qa_chain.stream({"question": question, "language": selected_language},
+                                                             config=run_config))
+                        answer = st.write_stream(stream)
+                    answer_box.markdown(link_timestamps(answer, video_id))
+                    st.caption(stream.summary())
+                    if question_vector is not None:
+                        pipeline.remember_answer(search_type, question_vector, answer)
 
 if col2.button("Generate Concise Summary"):
     with st.spinner("Summarizing..."):
-        video_id = extract_video_id(video_input)
         if not video_id:
             st.error("❌ Invalid YouTube URL or ID.")
         elif not selected_language:
             st.error("❌ Please select a transcript language first.")
         else:
-            transcript, transcript_list = get_transcript(video_id, selected_language)
-            if isinstance(transcript, str) and not transcript_list:
-                st.error(transcript)
+            pipeline = current_pipeline(video_id, selected_language, search_type)
+            warmups.wait(pipeline, stage="transcript")
+            error = pipeline.load_transcript()
+            if error:
+                st.error(error)
             else:
-                chain = create_qa_chain(summaryType="concise_summary", transcript=transcript, language=selected_language)
-                summary = chain.invoke({"transcript": transcript, "language": selected_language})
+                chain = pipeline.concise_summary_chain()
                 st.success("✅ Concise Summary:")
-                st.write(summary)
+                stream = TimedStream(chain.stream({"transcript": pipeline.transcript, "language": selected_language},
+                                                      config=run_config))
+                st.write_stream(stream)
+                st.caption(stream.summary())
 
 if col3.button("Generate Detailed Summary"):
     with st.spinner("Summarizing..."):
-        video_id = extract_video_id(video_input)
         if not video_id:
             st.error("❌ Invalid YouTube URL or ID.")
         elif not selected_language:
             st.error("❌ Please select a transcript language first.")
         else:
-            transcript, transcript_list = get_transcript(video_id, selected_language)
-            if isinstance(transcript, str) and not transcript_list:
-                st.error(transcript)
+            pipeline = current_pipeline(video_id, selected_language, search_type)
+            warmups.wait(pipeline, stage="transcript")
+            error = pipeline.load_transcript()
+            if error:
+                st.error(error)
             else:
-                chain = create_qa_chain(summaryType="detailed_summary", transcript=transcript, language=selected_language)
-                summary = chain.invoke(transcript)
+                # Partial summaries show up as each chunk finishes, before the final reduce
+                partials_box = st.expander("Partial summaries", expanded=True)
+
+                def show_partial(index, partial):
+                    partials_box.markdown(f"**Part {index + 1}**\n\n{partial}")
+
+                tokens = stream_full_summarization(get_cached_chat_model(), pipeline.transcript,
+                                                   on_partial=show_partial, callbacks=run_config["callbacks"],
+                                                   session_id=session_id, language=selected_language)
+                stream = TimedStream(tokens)
                 st.success("✅ Detailed Summary:")
-                st.write(summary)
+                st.write_stream(stream)
+                st.caption(stream.summary())
+
+# Debug panel, only when the process runs with PIPELINE_METRICS=1
+if metrics.ENABLED:
+    with st.sidebar.expander("🛠️ Pipeline metrics", expanded=False):
+        snapshot = metrics.snapshot()
+        st.table([
+            {"stage": name, "calls": values["calls"], "total s": round(values["seconds"], 3)}
+            for name, values in snapshot["stages"].items()
+        ])
+        st.json(snapshot["counters"])
+        if st.button("Reset metrics"):
+            metrics.reset()
@@ -0,0 +1,71 @@
+import numpy as np
+
+from utils.embeddings import TOKEN_PATTERN
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """
+    Compact in-memory BM25 over a fixed list of documents.
+
+    Postings are stored CSR-style: for term t, doc ids and term frequencies live in
+    `doc_ids[indptr[t]:indptr[t + 1]]` / `tfs[...]`. IDF and per-document length
+    norms are precomputed, so a query is a few array gathers and one np.add.at.
+    """
+
+    def __init__(self, docs, k1=1.5, b=0.75):
+        self.docs = docs
+        self.k1 = k1
+
+        term_ids = {}
+        pairs = []
+        lengths = np.zeros(len(docs), dtype=np.float32)
+        for doc_id, doc in enumerate(docs):
+            counts = {}
+            tokens = tokenize(doc.page_content)
+            lengths[doc_id] = len(tokens)
+            for token in tokens:
+                term = term_ids.setdefault(token, len(term_ids))
+                counts[term] = counts.get(term, 0) + 1
+            pairs.extend((term, doc_id, tf) for term, tf in counts.items())
+
+        self.term_ids = term_ids
+        postings = np.array(pairs, dtype=np.int64).reshape(-1, 3)
+        # Sort by term so each term's postings are contiguous
+        postings = postings[np.argsort(postings[:, 0], kind="stable")]
+        self.doc_ids = postings[:, 1].astype(np.int32)
+        self.tfs = postings[:, 2].astype(np.float32)
+        df = np.bincount(postings[:, 0], minlength=len(term_ids))
+        self.indptr = np.zeros(len(term_ids) + 1, dtype=np.int64)
+        np.cumsum(df, out=self.indptr[1:])
+
+        self.idf = np.log1p((len(docs) - df + 0.5) / (df + 0.5)).astype(np.float32)
+        average_length = lengths.mean() if len(docs) else 0.0
+        self.length_norm = (k1 * (1 - b + b * lengths / max(average_length, 1.0))).astype(np.float32)
+
+    def scores(self, query):
+        scores = np.zeros(len(self.docs), dtype=np.float32)
+        for token in set(tokenize(query)):
+            term = self.term_ids.get(token)
+            if term is None:
+                continue
+            start, end = self.indptr[term], self.indptr[term + 1]
+            doc_ids = self.doc_ids[start:end]
+            tfs = self.tfs[start:end]
+            np.add.at(scores, doc_ids, self.idf[term] * tfs * (self.k1 + 1) / (tfs + self.length_norm[doc_ids]))
+        return scores
+
+    def search(self, query, k=6):
+        """
+        Returns up to k (doc_id, score) pairs with a positive score, best first.
+        """
+        scores = self.scores(query)
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top if scores[i] > 0]
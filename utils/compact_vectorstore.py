@@ -0,0 +1,159 @@
+import logging
+import math
+import pickle
+import sys
+
+import faiss
+import numpy as np
+from langchain_community.docstore.base import Docstore
+from langchain_core.documents import Document
+from langchain_community.vectorstores import FAISS
+
+from utils import metrics
+from utils.providers import get_embedding
+
+INDEX_TYPES = ("flat", "fp16", "sq8", "pq")
+# PQ codebooks get 2**nbits centroids per sub-vector; a video only has a few
+# hundred chunks, so bits per code shrink until each centroid has enough samples
+PQ_MAX_NBITS = 8
+PQ_MIN_NBITS = 4
+PQ_SAMPLES_PER_CENTROID = 16
+
+logger = logging.getLogger("ytchat.index")
+
+
+class OffsetDocstore(Docstore):
+    """
+    Docstore that keeps one shared transcript string and per-chunk offsets.
+
+    Instead of one Document (and one Python string) per chunk, chunk text is
+    sliced out of the transcript on lookup. Offsets and timestamps are parallel
+    NumPy arrays; chunks must be verbatim slices of `text` at `start_index`.
+    """
+
+    def __init__(self, text, chunks, video_id=None):
+        self.text = text
+        self.video_id = video_id
+        self.offsets = np.array([chunk.metadata["start_index"] for chunk in chunks], dtype=np.int64)
+        self.lengths = np.array([len(chunk.page_content) for chunk in chunks], dtype=np.int32)
+        self.starts = np.array([chunk.metadata.get("start", np.nan) for chunk in chunks], dtype=np.float32)
+        self.ends = np.array([chunk.metadata.get("end", np.nan) for chunk in chunks], dtype=np.float32)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def search(self, search):
+        i = int(search)
+        if not 0 <= i < len(self.offsets):
+            return f"ID {search} not found."
+        offset = int(self.offsets[i])
+        metadata = {"start_index": offset}
+        if not np.isnan(self.starts[i]):
+            metadata["start"] = float(self.starts[i])
+            metadata["end"] = float(self.ends[i])
+        if self.video_id:
+            metadata["video_id"] = self.video_id
+        return Document(page_content=self.text[offset:offset + int(self.lengths[i])], metadata=metadata)
+
+    def add(self, texts):
+        raise NotImplementedError("OffsetDocstore is built once from a transcript and is read-only")
+
+    def delete(self, ids):
+        raise NotImplementedError("OffsetDocstore is built once from a transcript and is read-only")
+
+    def nbytes(self):
+        arrays = self.offsets.nbytes + self.lengths.nbytes + self.starts.nbytes + self.ends.nbytes
+        return sys.getsizeof(self.text) + arrays
+
+
+def pq_nbits(n_vectors, dimension):
+    """
+    Bits per PQ code for `n_vectors` samples, or None when PQ can't be trained on
+    that few vectors or wouldn't be smaller than SQ8. The codebook (2**nbits
+    float32 centroids per sub-vector) is stored with every index, so short
+    videos are cheaper as SQ8.
+    """
+    nbits = min(PQ_MAX_NBITS, int(math.log2(max(n_vectors, 1) / PQ_SAMPLES_PER_CENTROID)))
+    if nbits < PQ_MIN_NBITS:
+        return None
+    codebook_bytes = 2 ** nbits * dimension * 4
+    code_bytes = n_vectors * _pq_subquantizers(dimension) * nbits // 8
+    if codebook_bytes + code_bytes >= n_vectors * dimension:
+        return None
+    return nbits
+
+
+def _pq_subquantizers(dimension):
+    # Sub-vectors of ~8 dimensions each
+    return max(d for d in range(1, dimension // 8 + 1) if dimension % d == 0)
+
+
+def _build_index(vectors, index_type):
+    n_vectors, dimension = vectors.shape
+    if index_type == "pq":
+        nbits = pq_nbits(n_vectors, dimension)
+        if nbits is None:
+            logger.warning("PQ wouldn't be trainable or smaller than SQ8 for %d vectors; building sq8 instead",
+                           n_vectors)
+            index_type = "sq8"
+    if index_type == "fp16":
+        index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_fp16)
+    elif index_type == "sq8":
+        index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_8bit)
+    elif index_type == "pq":
+        index = faiss.IndexPQ(dimension, _pq_subquantizers(dimension), nbits)
+        # Sized above, so faiss needn't warn about the small training set
+        index.pq.cp.min_points_per_centroid = PQ_SAMPLES_PER_CENTROID
+    else:
+        index = faiss.IndexFlatL2(dimension)
+    if not index.is_trained:
+        index.train(vectors)
+    index.add(vectors)
+    return index
+
+
+def describe_index(index):
+    """
+    Short name of what a FAISS index actually stores, e.g. "sq8" or "pq96x5".
+    """
+    if isinstance(index, faiss.IndexPQ):
+        return f"pq{index.pq.M}x{index.pq.nbits}"
+    if isinstance(index, faiss.IndexScalarQuantizer):
+        return "fp16" if index.sq.qtype == faiss.ScalarQuantizer.QT_fp16 else "sq8"
+    if isinstance(index, faiss.IndexFlat):
+        return "flat"
+    return type(index).__name__
+
+
+def create_compact_vectorstore(chunks, text, embedding_function=None, index_type="sq8", video_id=None,
+                               vectors=None):
+    """
+    Like create_vectorstore, but with a quantized FAISS index and an OffsetDocstore.
+    `text` is the transcript the chunks were split from.
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"index_type must be one of {INDEX_TYPES}, got {index_type!r}")
+
+    embedding_function = embedding_function or get_embedding()
+    with metrics.stage("create_vectorstore"):
+        if vectors is None:
+            vectors = embedding_function.embed_matrix([chunk.page_content for chunk in chunks])
+        index = _build_index(np.ascontiguousarray(vectors, dtype=np.float32), index_type)
+        docstore = OffsetDocstore(text, chunks, video_id=video_id)
+        return FAISS(embedding_function, index, docstore, {i: str(i) for i in range(len(chunks))})
+
+
+def vectorstore_nbytes(vector_store):
+    """
+    Approximate resident bytes of a FAISS vector store: (index, docstore).
+    """
+    index_bytes = faiss.serialize_index(vector_store.index).nbytes
+    docstore = vector_store.docstore
+    if isinstance(docstore, OffsetDocstore):
+        docstore_bytes = docstore.nbytes()
+    else:
+        docstore_bytes = sum(
+            sys.getsizeof(doc.page_content) + len(pickle.dumps(doc.metadata))
+            for doc in docstore._dict.values()
+        )
+    return index_bytes, docstore_bytes
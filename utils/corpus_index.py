@@ -0,0 +1,152 @@
+import math
+import os
+import pickle
+import uuid
+
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+
+from utils.providers import get_embedding
+
+INDEX_TYPES = ("flat", "ivf", "hnsw")
+
+
+class CorpusIndex:
+    """
+    One FAISS index over many videos' chunks.
+
+    Every chunk keeps `video_id`, `language` and its `start`/`end` timestamps in
+    metadata, so queries can be narrowed to one video or language. `flat` is exact
+    and fine for small corpora; `ivf` (needs training, tuned with `nprobe`) and
+    `hnsw` (tuned with `ef_search`) trade a little recall for sub-linear search.
+    """
+
+    def __init__(self, dimension, index_type="flat", nlist=256, nprobe=8, hnsw_m=32, ef_search=64,
+                 embedding_function=None):
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"index_type must be one of {INDEX_TYPES}, got {index_type!r}")
+
+        self.dimension = dimension
+        self.index_type = index_type
+        self.nlist = nlist
+        self.hnsw_m = hnsw_m
+        self.counts = {}
+        self.vector_store = FAISS(embedding_function or get_embedding(), self._new_index(),
+                                  InMemoryDocstore({}), {})
+        self.set_nprobe(nprobe)
+        self.set_ef_search(ef_search)
+
+    def _new_index(self):
+        if self.index_type == "ivf":
+            return faiss.index_factory(self.dimension, f"IVF{self.nlist},Flat")
+        if self.index_type == "hnsw":
+            return faiss.index_factory(self.dimension, f"HNSW{self.hnsw_m},Flat")
+        return faiss.IndexFlatL2(self.dimension)
+
+    @property
+    def index(self):
+        return self.vector_store.index
+
+    def __len__(self):
+        return self.index.ntotal
+
+    def _enable_reconstruct(self):
+        # LangChain's MMR reconstructs candidate vectors, which an IVF index
+        # only supports with a direct map from ids to inverted list entries
+        if self.index_type == "ivf":
+            ivf = faiss.extract_index_ivf(self.index)
+            if ivf.direct_map.no():
+                ivf.make_direct_map()
+
+    def set_nprobe(self, nprobe):
+        self.nprobe = nprobe
+        if self.index_type == "ivf":
+            faiss.extract_index_ivf(self.index).nprobe = nprobe
+
+    def set_ef_search(self, ef_search):
+        self.ef_search = ef_search
+        if self.index_type == "hnsw":
+            self.index.hnsw.efSearch = ef_search
+
+    def train(self, vectors):
+        """
+        Trains the IVF coarse quantizer. Needs at least `nlist` sample vectors,
+        ideally ~40 per list; a no-op for flat and HNSW indexes.
+        """
+        if self.index.is_trained:
+            return
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if len(vectors) < self.nlist:
+            raise ValueError(f"IVF training needs at least nlist={self.nlist} vectors, got {len(vectors)}")
+        self.index.train(vectors)
+
+    def add_video(self, video_id, language, chunks, vectors):
+        """
+        Adds one video's chunks with their precomputed (n, dimension) float32 vectors.
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if not self.index.is_trained:
+            self.train(vectors)
+
+        ids = [str(uuid.uuid4()) for _ in chunks]
+        offset = self.index.ntotal
+        for chunk in chunks:
+            chunk.metadata["video_id"] = video_id
+            chunk.metadata["language"] = language
+
+        self.index.add(vectors)
+        self._enable_reconstruct()
+        self.vector_store.docstore.add(dict(zip(ids, chunks)))
+        self.vector_store.index_to_docstore_id.update({offset + i: id_ for i, id_ in enumerate(ids)})
+        key = (video_id, language)
+        self.counts[key] = self.counts.get(key, 0) + len(chunks)
+
+    def search_kwargs(self, video_id=None, language=None, k=6):
+        """
+        Retriever kwargs for create_qa_chain, filtered to a video and/or language.
+        """
+        metadata_filter = {}
+        if video_id is not None:
+            metadata_filter["video_id"] = video_id
+        if language is not None:
+            metadata_filter["language"] = language
+        if not metadata_filter:
+            return {"k": k}
+
+        matching = sum(count for (vid, lang), count in self.counts.items()
+                       if video_id in (None, vid) and language in (None, lang))
+        # FAISS filters after the search, so over-fetch in proportion to how
+        # small a share of the corpus the filter keeps
+        share = max(matching, 1) / max(len(self), 1)
+        fetch_k = min(len(self), max(4 * k, math.ceil(2 * k / share)))
+        return {"k": k, "filter": metadata_filter, "fetch_k": fetch_k}
+
+    def save(self, path):
+        self.vector_store.save_local(path)
+        config = {
+            "dimension": self.dimension,
+            "index_type": self.index_type,
+            "nlist": self.nlist,
+            "nprobe": self.nprobe,
+            "hnsw_m": self.hnsw_m,
+            "ef_search": self.ef_search,
+            "counts": self.counts,
+        }
+        with open(os.path.join(path, "corpus.pkl"), "wb") as f:
+            pickle.dump(config, f)
+
+    @classmethod
+    def load(cls, path, embedding_function=None):
+        with open(os.path.join(path, "corpus.pkl"), "rb") as f:
+            config = pickle.load(f)
+        counts = config.pop("counts")
+        corpus = cls(embedding_function=embedding_function, **config)
+        corpus.vector_store = FAISS.load_local(path, corpus.vector_store.embeddings,
+                                               allow_dangerous_deserialization=True)
+        corpus.counts = counts
+        corpus._enable_reconstruct()
+        corpus.set_nprobe(corpus.nprobe)
+        corpus.set_ef_search(corpus.ef_search)
+        return corpus
@@ -1,26 +1,13 @@
-from dotenv import load_dotenv
-from youtube_transcript_api import YouTubeTranscriptApi
-from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
-from langchain_community.vectorstores import FAISS
 from langchain_core.prompts import PromptTemplate
 from langchain_core.runnables import RunnableParallel, RunnablePassthrough, RunnableLambda
 from langchain_core.output_parsers import StrOutputParser
-import re
-from urllib.parse import urlparse, parse_qs
-from summarization_chain import build_full_summarization_chain
-from langchain.retrievers import ContextualCompressionRetriever
-from langchain.retrievers.document_compressors import LLMChainExtractor
-from utils.format_docs import format_docs
-load_dotenv()
+from summarization_chain import build_concise_summary_chain, build_full_summarization_chain
+from utils.format_docs import format_docs, without_offsets
+from utils.providers import get_cached_chat_model, get_chat_model
 
-embedding = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
-model = ChatGoogleGenerativeAI(model='models/gemini-1.5-flash')
 
-
-
-def create_qa_chain(vector_store=None, search_type=None, summaryType=None, transcript=None,language="english"):
+def create_qa_chain(vector_store=None, search_type=None, summaryType=None, transcript=None,language="english",
+                    search_kwargs=None, compressor="local"):
     prompt = PromptTemplate(
     template="""
     You are a helpful and concise assistant. Use only the information provided in the context below to answer the question. 
@@ -28,6 +15,8 @@ def create_qa_chain(vector_store=None, search_type=None, summaryType=None, trans
 
     If the answer cannot be found in the context, reply with "I don't know."
 
+    Context passages may start with a timestamp like [t=MM:SS]. When they do, cite the timestamps of the passages you used.
+
     Respond in the following language: {language}
 
     Context:
@@ -57,20 +46,45 @@ def create_qa_chain(vector_store=None, search_type=None, summaryType=None, trans
 
     # This will be overwritten conditionally
     final_chain = None
+    model = get_chat_model()
 
     if summaryType is None:
         # Step 1: Create base retriever using the provided search_type
         search = "mmr" if search_type == "compression" else (search_type or "similarity")
 
-        retriever = vector_store.as_retriever(search_type=search, search_kwargs={"k": 6})
+        # search_kwargs can narrow a corpus index to one video, see CorpusIndex.search_kwargs
+        search_kwargs = search_kwargs or {"k": 6}
+        if search_type == "hybrid":
+            from utils.hybrid_retriever import HybridRetriever
+
+            retriever = HybridRetriever.from_vector_store(
+                vector_store, k=search_kwargs["k"], metadata_filter=search_kwargs.get("filter") or {}
+            )
+        else:
+            retriever = vector_store.as_retriever(search_type=search, search_kwargs=search_kwargs)
 
         # Step 2: Wrap retriever with compression layer if requested
+        # "local" scores sentences on CPU; "llm" makes one Gemini call per retrieved chunk
         if search_type == "compression":
-            compressor = LLMChainExtractor.from_llm(model)
+            from langchain.retrievers import ContextualCompressionRetriever
+
+            if compressor == "llm":
+                from langchain.retrievers.document_compressors import LLMChainExtractor
+
+                # Runs while the user waits for an answer, so it isn't queued behind summaries
+                base_compressor = LLMChainExtractor.from_llm(get_cached_chat_model("interactive"))
+            else:
+                from utils.extractive_compressor import ExtractiveCompressor
+
+                # Local scoring: the store's embedding may be a remote, cached API
+                base_compressor = ExtractiveCompressor()
             retriever = ContextualCompressionRetriever(
-                base_compressor=compressor,
+                base_compressor=base_compressor,
                 base_retriever=retriever
             )
+            if compressor == "llm":
+                # Extracted text can't be merged by transcript offset in format_docs
+                retriever = retriever | RunnableLambda(without_offsets)
 
         # Step 3: Create chain for Q&A
         parser = StrOutputParser()
@@ -82,12 +96,12 @@ def create_qa_chain(vector_store=None, search_type=None, summaryType=None, trans
         final_chain = parallel_chain | prompt | model | parser
 
     elif summaryType == "detailed_summary":
-        num_chunks = 10
-        avg_chunk_length = len(transcript) // num_chunks
-        final_chain = build_full_summarization_chain(model, chunk_size=avg_chunk_length)
+        # Chunks are sized by token budget, so long videos get more chunks, not bigger ones
+        final_chain = build_full_summarization_chain(get_cached_chat_model(), language=language)
 
     elif summaryType == "concise_summary":
-        final_chain = prompt1 | model | StrOutputParser()
+        # Long transcripts are shrunk locally or map-reduced instead of sent whole
+        final_chain = build_concise_summary_chain(get_cached_chat_model(), prompt1)
 
     return final_chain
 
@@ -1,27 +1,33 @@
-# chatbot.py
+import uuid
 
-from dotenv import load_dotenv
-from youtube_transcript_api import YouTubeTranscriptApi
-from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+import faiss
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores import FAISS
-from langchain_core.prompts import PromptTemplate
-from langchain_core.runnables import RunnableParallel, RunnablePassthrough, RunnableLambda
-from langchain_core.output_parsers import StrOutputParser
-import re
-from urllib.parse import urlparse, parse_qs
-from summarization_chain import build_full_summarization_chain
 
-from langchain.retrievers import ContextualCompressionRetriever
-from langchain.retrievers.document_compressors import LLMChainExtractor
-load_dotenv()
+from utils import metrics
+from utils.providers import get_embedding
 
-embedding = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
-model = ChatGoogleGenerativeAI(model='models/gemini-1.5-flash')
 
+def create_vectorstore(chunks, embedding_function=None, vectors=None):
+    """
+    Builds a FAISS index over the chunks. `vectors` can carry embeddings that
+    were already computed elsewhere (e.g. in a worker process during ingestion).
+    """
+    with metrics.stage("create_vectorstore"):
+        return _create_vectorstore(chunks, embedding_function, vectors)
 
 
-def create_vectorstore(chunks):
-    return FAISS.from_documents(chunks, embedding)
+def _create_vectorstore(chunks, embedding_function, vectors):
+    embedding_function = embedding_function or get_embedding()
+    if vectors is None and not hasattr(embedding_function, "embed_matrix"):
+        return FAISS.from_documents(chunks, embedding_function)
 
+    # Batched providers hand back one float32 matrix that goes straight into FAISS
+    if vectors is None:
+        vectors = embedding_function.embed_matrix([chunk.page_content for chunk in chunks])
+    index = faiss.IndexFlatL2(vectors.shape[1])
+    index.add(vectors)
+
+    ids = [str(uuid.uuid4()) for _ in chunks]
+    docstore = InMemoryDocstore(dict(zip(ids, chunks)))
+    return FAISS(embedding_function, index, docstore, dict(enumerate(ids)))
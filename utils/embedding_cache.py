@@ -0,0 +1,165 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+
+import numpy as np
+
+from utils import metrics
+from utils.embeddings import BatchedEmbeddings
+
+CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", os.path.join(".cache", "embeddings"))
+WHITESPACE = re.compile(r"\s+")
+# SQLite's default limit on bound parameters is 999
+LOOKUP_BATCH = 900
+
+
+def normalize_text(text):
+    return WHITESPACE.sub(" ", text).strip()
+
+
+class EmbeddingCache:
+    """
+    On-disk store of chunk embeddings for one model.
+
+    Vectors are appended as raw float32 rows to `vectors.f32`, which is read
+    through np.memmap; a small SQLite table maps sha256(model, normalized text)
+    to a row number. A bulk lookup is one indexed query per 900 keys plus one
+    fancy-index gather from the memory map.
+
+    Several processes (UI, API workers, ingest) can share one cache directory:
+    appends happen inside a SQLite write transaction, which serializes the
+    choice of row numbers and the append to the vectors file across processes.
+    """
+
+    def __init__(self, model_name, cache_dir=CACHE_DIR):
+        self.model_name = model_name
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+        self.path = os.path.join(cache_dir, safe_name)
+        self.dimension = None
+        self._conn = None
+        self._memmap = None
+        self._lock = threading.Lock()
+
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(self.path, exist_ok=True)
+            self._conn = sqlite3.connect(os.path.join(self.path, "index.sqlite3"), timeout=30,
+                                         check_same_thread=False)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS rows (key BLOB PRIMARY KEY, row INTEGER NOT NULL)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        if self.dimension is None:
+            # Re-read until some process has stored the first vectors
+            found = self._conn.execute("SELECT value FROM meta WHERE name = 'dimension'").fetchone()
+            self.dimension = found[0] if found else None
+        return self._conn
+
+    @property
+    def _vectors_file(self):
+        return os.path.join(self.path, "vectors.f32")
+
+    def key(self, text):
+        return hashlib.sha256(f"{self.model_name}\0{normalize_text(text)}".encode("utf-8")).digest()
+
+    def _vectors(self):
+        # Re-mapped only when rows were appended since the last read
+        rows = os.path.getsize(self._vectors_file) // (4 * self.dimension)
+        if self._memmap is None or len(self._memmap) != rows:
+            self._memmap = np.memmap(self._vectors_file, dtype=np.float32, mode="r", shape=(rows, self.dimension))
+        return self._memmap
+
+    def get_many(self, keys):
+        """
+        Returns {key: vector} for the keys that are cached.
+        """
+        with self._lock:
+            db = self._db()
+            if self.dimension is None:
+                return {}
+            found = []
+            for i in range(0, len(keys), LOOKUP_BATCH):
+                batch = keys[i:i + LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                found.extend(db.execute(f"SELECT key, row FROM rows WHERE key IN ({placeholders})", batch))
+            if not found:
+                return {}
+            rows = np.fromiter((row for _, row in found), dtype=np.int64, count=len(found))
+            vectors = np.asarray(self._vectors()[rows])
+        return {key: vectors[i] for i, (key, _) in enumerate(found)}
+
+    def put_many(self, keys, vectors):
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock:
+            db = self._db()
+            # Takes the database write lock, so no other process appends until we commit
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                found = db.execute("SELECT value FROM meta WHERE name = 'dimension'").fetchone()
+                self.dimension = found[0] if found else vectors.shape[1]
+                if not found:
+                    db.execute("INSERT INTO meta (name, value) VALUES ('dimension', ?)", (self.dimension,))
+                row_bytes = 4 * self.dimension
+                with open(self._vectors_file, "ab") as f:
+                    # Drop a partial row left by a writer that crashed mid-append
+                    first_row = f.tell() // row_bytes
+                    f.truncate(first_row * row_bytes)
+                    f.write(vectors.tobytes())
+                db.executemany("INSERT OR IGNORE INTO rows (key, row) VALUES (?, ?)",
+                               [(key, first_row + i) for i, key in enumerate(keys)])
+                db.commit()
+            except BaseException:
+                db.rollback()
+                raise
+
+
+class CachedEmbeddings(BatchedEmbeddings):
+    """
+    Batched embeddings that only send cache misses to the wrapped provider.
+
+    Identical chunks (sponsor reads, intros, re-chunked text) are embedded once
+    per model across all videos. Queries are passed through uncached.
+    """
+
+    def __init__(self, embeddings, cache=None):
+        super().__init__(batch_size=embeddings.batch_size)
+        self.embeddings = embeddings
+        self.model_name = embeddings.model_name
+        self.cache = cache or EmbeddingCache(self.model_name)
+        self.stats = {"hits": 0, "misses": 0}
+
+    @property
+    def dimension(self):
+        return self.embeddings.dimension or self.cache.dimension
+
+    def embed_matrix(self, texts):
+        texts = list(texts)
+        keys = [self.cache.key(text) for text in texts]
+        cached = self.cache.get_many(list(dict.fromkeys(keys)))
+
+        # Unique misses only, in first-seen order, sent in the provider's batches
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        if missing:
+            fresh = self.embeddings.embed_matrix(list(missing.values()))
+            self.cache.put_many(list(missing), fresh)
+            cached.update(zip(missing, fresh))
+
+        hits = len(texts) - len(missing)
+        self.stats["hits"] += hits
+        self.stats["misses"] += len(missing)
+        metrics.count("embedding_cache_hits", hits)
+        metrics.count("embedding_cache_misses", len(missing))
+
+        if not texts:
+            return np.zeros((0, self.dimension or 0), dtype=np.float32)
+        return np.vstack([cached[key] for key in keys]).astype(np.float32, copy=False)
+
+    def embed_query(self, text):
+        return self.embeddings.embed_query(text)
+
+    def hit_rate(self):
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
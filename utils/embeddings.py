@@ -0,0 +1,119 @@
+import re
+import zlib
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from utils import metrics
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize_rows(matrix):
+    """
+    L2-normalizes each row in place and returns it as contiguous float32.
+    """
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+class BatchedEmbeddings(Embeddings):
+    """
+    Base class for embedding providers with a batched matrix API.
+
+    Subclasses implement `_embed_batch(texts)` returning an (n, dim) array.
+    `embed_matrix` returns normalized float32 rows ready for `faiss.Index.add`,
+    so indexing never goes through per-document Python lists.
+    """
+
+    def __init__(self, batch_size=64):
+        self.batch_size = batch_size
+
+    def _embed_batch(self, texts):
+        raise NotImplementedError
+
+    def embed_matrix(self, texts):
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, self.dimension or 0), dtype=np.float32)
+        with metrics.stage("embed"):
+            batches = [
+                self._embed_batch(texts[i:i + self.batch_size])
+                for i in range(0, len(texts), self.batch_size)
+            ]
+        metrics.count("embedding_calls", len(batches))
+        metrics.count("embedded_texts", len(texts))
+        return normalize_rows(np.vstack(batches))
+
+    def embed_documents(self, texts):
+        return self.embed_matrix(texts).tolist()
+
+    def embed_query(self, text):
+        return self.embed_matrix([text])[0].tolist()
+
+
+class HashingEmbeddings(BatchedEmbeddings):
+    """
+    Offline, CPU-only embeddings: signed feature hashing of word unigrams and
+    bigrams into `dimension` buckets, built with one bincount per batch.
+    """
+
+    def __init__(self, dimension=1024, batch_size=256, ngrams=2):
+        super().__init__(batch_size=batch_size)
+        self.dimension = dimension
+        self.ngrams = ngrams
+
+    @property
+    def model_name(self):
+        return f"hashing-{self.dimension}-{self.ngrams}"
+
+    def _features(self, text):
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        features = list(tokens)
+        for n in range(2, self.ngrams + 1):
+            features.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return features
+
+    def _embed_batch(self, texts):
+        rows, hashes = [], []
+        for row, text in enumerate(texts):
+            features = self._features(text)
+            # crc32 is stable across processes, unlike the builtin hash()
+            hashes.extend(zlib.crc32(feature.encode("utf-8")) for feature in features)
+            rows.extend([row] * len(features))
+
+        hashes = np.asarray(hashes, dtype=np.uint32)
+        rows = np.asarray(rows, dtype=np.int64)
+        columns = (hashes % self.dimension).astype(np.int64)
+        # The top bit picks the sign so collisions tend to cancel out
+        signs = np.where(hashes >> 31, -1.0, 1.0).astype(np.float32)
+
+        counts = np.bincount(rows * self.dimension + columns, weights=signs,
+                             minlength=len(texts) * self.dimension)
+        return counts.reshape(len(texts), self.dimension).astype(np.float32)
+
+
+class RemoteBatchedEmbeddings(BatchedEmbeddings):
+    """
+    Adapts a LangChain embeddings client (e.g. Gemini) to the batched matrix API.
+    """
+
+    def __init__(self, embeddings, model_name, batch_size=100):
+        super().__init__(batch_size=batch_size)
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.dimension = None
+
+    def _embed_batch(self, texts):
+        matrix = np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+        self.dimension = matrix.shape[1]
+        return matrix
+
+    def embed_query(self, text):
+        with metrics.stage("embed_query"):
+            vector = np.asarray([self.embeddings.embed_query(text)], dtype=np.float32)
+        metrics.count("embedding_calls")
+        return normalize_rows(vector)[0].tolist()
@@ -0,0 +1,10 @@
+# Rough average for Gemini/SentencePiece tokenizers on English text. Counting
+# through the API costs a network round trip, which defeats the point of budgeting.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """
+    Cheap local estimate of how many tokens `text` will use in a prompt.
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
@@ -1,4 +1,3 @@
-import re
 from urllib.parse import urlparse, parse_qs
 def extract_video_id(url_or_id):
     """
@@ -0,0 +1,75 @@
+import re
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.documents.compressor import BaseDocumentCompressor
+
+from utils.embeddings import HashingEmbeddings, normalize_rows
+from utils.estimate_tokens import estimate_tokens
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+# Auto-generated captions often have no punctuation; fall back to word windows
+WINDOW_WORDS = 30
+
+# Sentences are scored locally, so compression never sends them to an embedding API
+_embedding = HashingEmbeddings(dimension=512, batch_size=1024)
+
+
+def split_sentences(text):
+    sentences = [s for s in SENTENCE_BOUNDARY.split(text.strip()) if s]
+    if len(sentences) > 1:
+        return sentences
+    words = text.split()
+    return [" ".join(words[i:i + WINDOW_WORDS]) for i in range(0, len(words), WINDOW_WORDS)]
+
+
+class ExtractiveCompressor(BaseDocumentCompressor):
+    """
+    CPU-only replacement for LLMChainExtractor.
+
+    Splits the retrieved chunks into sentences, scores all of them against the
+    query in one matrix product, and keeps the best ones within `max_tokens`.
+    Kept sentences stay in transcript order inside their chunk. Scoring uses
+    local hashing embeddings unless another `embedding` is given.
+    """
+
+    embedding: object = None
+    max_tokens: int = 600
+    min_score: float = 0.0
+
+    def compress_documents(self, documents, query, callbacks=None):
+        sentences, owners = [], []
+        for doc_index, doc in enumerate(documents):
+            for sentence in split_sentences(doc.page_content):
+                sentences.append(sentence)
+                owners.append(doc_index)
+        if not sentences:
+            return []
+
+        # Rows are L2-normalized, so the dot product is cosine similarity
+        embedding = self.embedding or _embedding
+        if hasattr(embedding, "embed_matrix"):
+            matrix = embedding.embed_matrix(sentences + [query])
+        else:
+            matrix = normalize_rows(np.asarray(embedding.embed_documents(sentences + [query])))
+        scores = matrix[:-1] @ matrix[-1]
+
+        keep = []
+        budget = self.max_tokens
+        for i in np.argsort(-scores, kind="stable"):
+            if scores[i] <= self.min_score:
+                break
+            tokens = estimate_tokens(sentences[i])
+            if tokens > budget:
+                continue
+            keep.append(i)
+            budget -= tokens
+
+        compressed = []
+        for doc_index, doc in enumerate(documents):
+            kept = [sentences[i] for i in sorted(keep) if owners[i] == doc_index]
+            if kept:
+                # No longer a verbatim slice, so format_docs must not merge it by offset
+                metadata = {key: value for key, value in doc.metadata.items() if key != "start_index"}
+                compressed.append(Document(page_content=" ".join(kept), metadata=metadata))
+        return compressed
@@ -0,0 +1,44 @@
+import numpy as np
+
+from utils.embeddings import HashingEmbeddings
+from utils.estimate_tokens import estimate_tokens
+from utils.extractive_compressor import split_sentences
+
+# Local and deterministic, so the pre-pass never costs an embedding API call
+_embedding = HashingEmbeddings(dimension=512, batch_size=1024)
+
+
+def select_sentences(text, max_tokens, redundancy=0.5):
+    """
+    Shrinks `text` to about `max_tokens` by keeping its most central sentences.
+
+    Sentences are scored by cosine similarity to the transcript centroid, with
+    a penalty for being too close to a sentence already picked (MMR-style), so
+    one repeated point doesn't crowd out the rest. Picked sentences are returned
+    in their original order.
+    """
+    sentences = split_sentences(text)
+    if estimate_tokens(text) <= max_tokens or not sentences:
+        return text
+
+    matrix = _embedding.embed_matrix(sentences)
+    centroid = matrix.mean(axis=0)
+    centroid /= np.linalg.norm(centroid) or 1.0
+    relevance = matrix @ centroid
+    tokens = np.array([estimate_tokens(s) for s in sentences])
+
+    picked = []
+    max_similarity = np.zeros(len(sentences), dtype=np.float32)
+    available = np.ones(len(sentences), dtype=bool)
+    budget = max_tokens
+    while budget > 0:
+        scores = np.where(available & (tokens <= budget), relevance - redundancy * max_similarity, -np.inf)
+        best = int(np.argmax(scores))
+        if scores[best] == -np.inf:
+            break
+        picked.append(best)
+        available[best] = False
+        budget -= tokens[best]
+        np.maximum(max_similarity, matrix @ matrix[best], out=max_similarity)
+
+    return " ".join(sentences[i] for i in sorted(picked))
@@ -1,25 +1,109 @@
-# chatbot.py
+import os
 
-from dotenv import load_dotenv
-from youtube_transcript_api import YouTubeTranscriptApi
-from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
-from langchain_community.vectorstores import FAISS
-from langchain_core.prompts import PromptTemplate
-from langchain_core.runnables import RunnableParallel, RunnablePassthrough, RunnableLambda
-from langchain_core.output_parsers import StrOutputParser
-import re
-from urllib.parse import urlparse, parse_qs
-from summarization_chain import build_full_summarization_chain
+from utils.estimate_tokens import CHARS_PER_TOKEN
+from utils.format_timestamp import format_timestamp
 
-from langchain.retrievers import ContextualCompressionRetriever
-from langchain.retrievers.document_compressors import LLMChainExtractor
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", 2000))
+SEPARATOR = "\n\n"
 
 
+def format_docs(retrieved_docs, max_tokens=CONTEXT_TOKEN_BUDGET):
+    """
+    Packs retrieved chunks into the prompt context.
 
-def format_docs(retrieved_docs):
-    return "\n\n".join(doc.page_content for doc in retrieved_docs)
+    Chunks that overlap or touch in the original transcript are merged with the
+    repeated overlap removed, the least relevant passages are dropped until the
+    rest fits in `max_tokens`, and what's left is put back in transcript order.
+    """
+    passages = _merge_passages(retrieved_docs)
 
+    # Budgeted in characters of the final string, timestamps and separators included
+    budget = max_tokens * CHARS_PER_TOKEN if max_tokens else None
+    kept, used = [], 0
+    for passage in sorted(passages, key=lambda p: p["rank"]):
+        size = len(_with_timestamp(passage)) + (len(SEPARATOR) if kept else 0)
+        if budget and used + size > budget:
+            if kept:
+                continue
+            # Always keep the best passage, cut down to the budget
+            prefix = len(_with_timestamp(passage)) - len(passage["text"])
+            passage["text"] = passage["text"][:max(budget - prefix, 0)]
+            size = len(_with_timestamp(passage))
+        kept.append(passage)
+        used += size
 
+    kept.sort(key=lambda p: p["order"])
+    return SEPARATOR.join(_with_timestamp(passage) for passage in kept)
 
+
+def _merge_passages(docs):
+    passages = []
+    open_passages = {}
+    ordered = sorted(
+        enumerate(docs),
+        key=lambda item: (str(item[1].metadata.get("video_id", "")), _position(item[1]), item[0])
+    )
+    for rank, doc in ordered:
+        start = doc.metadata.get("start_index")
+        video = doc.metadata.get("video_id")
+        current = open_passages.get(video)
+
+        # Only chunks that are verbatim slices of the transcript can be merged by offset
+        if (start is not None and current is not None and current["end"] is not None
+                and start <= current["end"] + 1 and _continues(current, doc.page_content, start)):
+            end = start + len(doc.page_content)
+            if end > current["end"]:
+                overlap = current["end"] - start
+                separator = "" if overlap >= 0 else " "
+                current["text"] += separator + doc.page_content[max(overlap, 0):]
+                current["end"] = end
+                current["end_time"] = doc.metadata.get("end", current["end_time"])
+            current["rank"] = min(current["rank"], rank)
+            continue
+
+        passage = {
+            "text": doc.page_content,
+            "rank": rank,
+            "order": (str(video or ""), _position(doc)),
+            "start_time": doc.metadata.get("start"),
+            "end_time": doc.metadata.get("end"),
+            "end": start + len(doc.page_content) if start is not None else None,
+        }
+        passages.append(passage)
+        open_passages[video] = passage
+    return passages
+
+
+def _continues(current, text, start):
+    # A chunk rewritten by a compressor keeps its start_index but no longer matches the overlap
+    overlap = current["end"] - start
+    if overlap <= 0:
+        return True
+    if overlap > len(current["text"]):
+        return False
+    return text.startswith(current["text"][-overlap:][:len(text)])
+
+
+def without_offsets(docs):
+    """
+    Drops start_index from documents whose text is no longer a verbatim slice, e.g. after LLM extraction.
+    """
+    # Copied because retrievers and compressors share metadata dicts with the docstore
+    return [
+        doc.model_copy(update={"metadata": {k: v for k, v in doc.metadata.items() if k != "start_index"}})
+        for doc in docs
+    ]
+
+
+def _position(doc):
+    start = doc.metadata.get("start_index")
+    if start is None:
+        start = doc.metadata.get("start", 0)
+    return start
+
+
+def _with_timestamp(passage):
+    # Chunks from split_segments know where they are in the video
+    if passage["start_time"] is None:
+        return passage["text"]
+    return f"[t={format_timestamp(passage['start_time'])}] {passage['text']}"
@@ -0,0 +1,25 @@
+import re
+
+TIMESTAMP_PATTERN = re.compile(r"\[?t=((?:\d+:)?\d{1,2}:\d{2})\]?")
+
+
+def format_timestamp(seconds):
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+def link_timestamps(text, video_id):
+    """
+    Turns `t=MM:SS` citations in an answer into markdown links into the video.
+    """
+    def to_link(match):
+        seconds = 0
+        for part in match.group(1).split(":"):
+            seconds = seconds * 60 + int(part)
+        return f"[{match.group(1)}](https://youtu.be/{video_id}?t={seconds})"
+
+    return TIMESTAMP_PATTERN.sub(to_link, text)
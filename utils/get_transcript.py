@@ -1,17 +1,5 @@
-from dotenv import load_dotenv
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
-from langchain_community.vectorstores import FAISS
-from langchain_core.prompts import PromptTemplate
-from langchain_core.runnables import RunnableParallel, RunnablePassthrough, RunnableLambda
-from langchain_core.output_parsers import StrOutputParser
-import re
-from urllib.parse import urlparse, parse_qs
-
-from langchain.retrievers import ContextualCompressionRetriever
-from langchain.retrievers.document_compressors import LLMChainExtractor
 
 
 def list_available_transcript_languages(video_id):
@@ -51,6 +39,3 @@ def get_transcript(video_id,language):
         return "No transcript found in the specified language.", []
     except Exception as e:
         return f"An unexpected error occurred: {e}", []
-    
-id="hTSaweR8qMI"
-print(list_available_transcript_languages(id))
\ No newline at end of file
@@ -0,0 +1,63 @@
+from langchain_core.retrievers import BaseRetriever
+
+from utils.bm25_index import BM25Index
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """
+    Fuses ranked lists of keys; each key scores sum(1 / (k + rank)) over the lists.
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+def _matches(doc, metadata_filter):
+    return all(doc.metadata.get(key) == value for key, value in metadata_filter.items())
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    BM25 + dense retrieval fused with reciprocal rank fusion.
+
+    Dense search finds paraphrases; BM25 catches exact names and numbers that
+    embeddings blur together.
+    """
+
+    vector_store: object
+    bm25: BM25Index
+    k: int = 6
+    candidates: int = 20
+    rrf_k: int = 60
+    metadata_filter: dict = {}
+
+    @classmethod
+    def from_vector_store(cls, vector_store, **kwargs):
+        # Chunks in FAISS insertion order, so BM25 doc ids line up with the index
+        docs = [vector_store.docstore.search(vector_store.index_to_docstore_id[i])
+                for i in range(len(vector_store.index_to_docstore_id))]
+        return cls(vector_store=vector_store, bm25=BM25Index(docs), **kwargs)
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        search_kwargs = {"k": self.candidates}
+        if self.metadata_filter:
+            search_kwargs["filter"] = self.metadata_filter
+            search_kwargs["fetch_k"] = self.candidates * 4
+        dense = self.vector_store.similarity_search(query, **search_kwargs)
+
+        lexical = [self.bm25.docs[doc_id] for doc_id, _ in self.bm25.search(query, self.candidates * 2)]
+        lexical = [doc for doc in lexical if _matches(doc, self.metadata_filter)][:self.candidates]
+
+        by_key = {}
+        rankings = []
+        for docs in (dense, lexical):
+            ranking = []
+            for doc in docs:
+                key = (doc.metadata.get("video_id"), doc.metadata.get("start_index"), doc.page_content)
+                by_key.setdefault(key, doc)
+                ranking.append(key)
+            rankings.append(ranking)
+
+        return [by_key[key] for key in reciprocal_rank_fusion(rankings, self.rrf_k)[:self.k]]
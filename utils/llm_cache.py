@@ -0,0 +1,149 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from langchain_core.caches import BaseCache
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk
+
+MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 4096))
+
+
+class LRULLMCache(BaseCache):
+    """
+    Bounded in-process cache for LLM generations.
+
+    LangChain calls it with the fully rendered prompt (template + chunk text +
+    language) and the serialized model config (model name, temperature, ...),
+    so hashing the two gives a content-addressed key: the same chunk summarized
+    for a different user or a different summary mode hits the same entry.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(prompt, llm_string):
+        digest = hashlib.sha256()
+        digest.update(llm_string.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    def lookup(self, prompt, llm_string):
+        key = self.make_key(prompt, llm_string)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return value
+
+    def update(self, prompt, llm_string, return_val):
+        key = self.make_key(prompt, llm_string)
+        with self._lock:
+            self._entries[key] = return_val
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def clear(self, **kwargs):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+llm_cache = LRULLMCache()
+
+
+class CachedChatModel(BaseChatModel):
+    """
+    Chat model wrapper that memoizes streamed calls as well as invoked ones.
+
+    BaseChatModel only consults `cache` on invoke/generate. Here a streamed
+    call first looks up the same key invoke would use: a hit is yielded as one
+    chunk, a miss streams from the wrapped model and stores the joined text.
+    """
+
+    inner: BaseChatModel
+
+    @property
+    def _llm_type(self):
+        return self.inner._llm_type
+
+    @property
+    def _identifying_params(self):
+        return self.inner._identifying_params
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return self.inner._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        return await self.inner._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    def _cache_key(self, messages, stop, kwargs):
+        # Same prompt and llm_string as BaseChatModel uses for invoke
+        return dumps(messages), self._get_llm_string(stop=stop, **kwargs)
+
+    def _cached_chunk(self, key):
+        cached = self.cache.lookup(*key) if isinstance(self.cache, BaseCache) else None
+        if cached:
+            return ChatGenerationChunk(message=AIMessageChunk(content=cached[0].message.content))
+        return None
+
+    def _remember(self, key, parts):
+        if isinstance(self.cache, BaseCache):
+            self.cache.update(*key, [ChatGeneration(message=AIMessage(content="".join(parts)))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        key = self._cache_key(messages, stop, kwargs)
+        chunk = self._cached_chunk(key)
+        if chunk is not None:
+            yield chunk
+            return
+        if type(self.inner)._stream is BaseChatModel._stream:
+            result = self.inner._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            chunks = [ChatGenerationChunk(message=AIMessageChunk(content=result.generations[0].message.content))]
+        else:
+            # run_manager carries the session metadata the scheduler reads
+            chunks = self.inner._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk.text)
+            yield chunk
+        self._remember(key, parts)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        key = self._cache_key(messages, stop, kwargs)
+        chunk = self._cached_chunk(key)
+        if chunk is not None:
+            yield chunk
+            return
+        parts = []
+        if type(self.inner)._astream is BaseChatModel._astream:
+            result = await self.inner._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            parts.append(result.generations[0].message.content)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=parts[0]))
+        else:
+            async for chunk in self.inner._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                parts.append(chunk.text)
+                yield chunk
+        self._remember(key, parts)
+
+
+def with_llm_cache(model, cache=llm_cache):
+    """
+    Returns the chat model wrapped so its calls, streamed or not, are memoized in `cache`.
+    """
+    return CachedChatModel(inner=model, cache=cache)
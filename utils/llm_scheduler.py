@@ -0,0 +1,291 @@
+import asyncio
+import contextlib
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessageChunk
+from langchain_core.outputs import ChatGenerationChunk
+
+from utils import metrics
+from utils.estimate_tokens import estimate_tokens
+
+# Lower value = served first
+PRIORITIES = {"interactive": 0, "summary": 1, "background": 2}
+
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", 300))
+TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", 1_000_000))
+MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", 256))
+
+
+class SchedulerOverloaded(RuntimeError):
+    """
+    Raised when the scheduler queue is full, so callers can back off.
+    """
+
+
+class TokenBucket:
+    """
+    Continuously refilling bucket of `per_minute` units, holding at most one minute's worth.
+    Not thread-safe on its own; LLMScheduler calls it under its lock.
+    """
+
+    def __init__(self, per_minute, clock=time.monotonic):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def can_take(self, amount):
+        self._refill()
+        return self.level >= min(amount, self.capacity)
+
+    def take(self, amount):
+        self.level -= min(amount, self.capacity)
+
+    def wait_time(self, amount):
+        self._refill()
+        return max(0.0, (min(amount, self.capacity) - self.level) / self.rate)
+
+
+class _Ticket:
+    __slots__ = ("priority", "session", "tokens", "enqueued", "granted", "notify")
+
+    def __init__(self, priority, session, tokens, notify):
+        self.priority = priority
+        self.session = session
+        self.tokens = tokens
+        self.enqueued = time.perf_counter()
+        self.granted = False
+        # Called under the scheduler lock once the ticket is admitted
+        self.notify = notify
+
+
+class LLMScheduler:
+    """
+    Process-wide admission control for chat model calls.
+
+    Callers wait in per-priority queues; inside a priority class, sessions are
+    served round-robin so one user's 40-chunk summary can't starve another's.
+    A call is admitted when it is at the head of the schedule, fewer than
+    `max_concurrency` calls are running, and the shared request and token
+    buckets have room. The queue is bounded; when it's full `acquire` raises
+    SchedulerOverloaded instead of letting latency grow without limit.
+
+    Threads wait with `acquire` and coroutines with `aacquire`; both share the
+    same queue, so async callers never park an executor thread while queued.
+    """
+
+    def __init__(self, max_concurrency=MAX_CONCURRENCY, requests_per_minute=REQUESTS_PER_MINUTE,
+                 tokens_per_minute=TOKENS_PER_MINUTE, max_queue=MAX_QUEUE):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.stats = {"admitted": 0, "rejected": 0, "wait_seconds": 0.0}
+        self._queues = {priority: OrderedDict() for priority in sorted(PRIORITIES.values())}
+        self._queued = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def _head(self):
+        for sessions in self._queues.values():
+            if sessions:
+                # Sessions rotate to the back after each admission, so the first one is next
+                return next(iter(sessions.values()))[0]
+        return None
+
+    def _admit(self, ticket):
+        sessions = self._queues[ticket.priority]
+        waiting = sessions[ticket.session]
+        waiting.popleft()
+        del sessions[ticket.session]
+        if waiting:
+            sessions[ticket.session] = waiting
+        self._queued -= 1
+        self._in_flight += 1
+        self.requests.take(1)
+        self.tokens.take(ticket.tokens)
+        waited = time.perf_counter() - ticket.enqueued
+        self.stats["admitted"] += 1
+        self.stats["wait_seconds"] += waited
+        metrics.observe("llm_queue_wait", waited)
+        ticket.granted = True
+        ticket.notify()
+
+    def _dispatch(self):
+        # Called with the lock held: admits head tickets while there is capacity
+        while self._in_flight < self.max_concurrency:
+            ticket = self._head()
+            if ticket is None:
+                return
+            if not (self.requests.can_take(1) and self.tokens.can_take(ticket.tokens)):
+                # Only the bucket refill can unblock the head, so check again then
+                delay = max(self.requests.wait_time(1), self.tokens.wait_time(ticket.tokens), 0.001)
+                if self._timer is None:
+                    self._timer = threading.Timer(delay, self._refilled)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+            self._admit(ticket)
+
+    def _refilled(self):
+        with self._lock:
+            self._timer = None
+            self._dispatch()
+
+    def _enqueue(self, priority, session, tokens, notify):
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self.stats["rejected"] += 1
+                raise SchedulerOverloaded(f"LLM queue is full ({self.max_queue} waiting)")
+            ticket = _Ticket(PRIORITIES[priority], session, tokens, notify)
+            self._queues[ticket.priority].setdefault(session, deque()).append(ticket)
+            self._queued += 1
+            self._dispatch()
+            return ticket
+
+    def _abandon(self, ticket):
+        # Returns True if the ticket was still queued; False if it was admitted meanwhile
+        with self._lock:
+            if ticket.granted:
+                return False
+            waiting = self._queues[ticket.priority][ticket.session]
+            waiting.remove(ticket)
+            if not waiting:
+                del self._queues[ticket.priority][ticket.session]
+            self._queued -= 1
+            self._dispatch()
+            return True
+
+    def acquire(self, priority="interactive", session=None, tokens=1, timeout=None):
+        admitted = threading.Event()
+        ticket = self._enqueue(priority, session, tokens, admitted.set)
+        if not admitted.wait(timeout) and self._abandon(ticket):
+            raise TimeoutError("timed out waiting for an LLM slot")
+
+    async def aacquire(self, priority="interactive", session=None, tokens=1, timeout=None):
+        loop = asyncio.get_running_loop()
+        admitted = loop.create_future()
+
+        def notify():
+            loop.call_soon_threadsafe(lambda: admitted.done() or admitted.set_result(None))
+
+        ticket = self._enqueue(priority, session, tokens, notify)
+        try:
+            await asyncio.wait_for(asyncio.shield(admitted), timeout)
+        except asyncio.TimeoutError:
+            if self._abandon(ticket):
+                raise TimeoutError("timed out waiting for an LLM slot")
+        except asyncio.CancelledError:
+            if not self._abandon(ticket):
+                self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            self._in_flight -= 1
+            self._dispatch()
+
+    @contextlib.contextmanager
+    def slot(self, priority="interactive", session=None, tokens=1, timeout=None):
+        self.acquire(priority, session, tokens, timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    @contextlib.asynccontextmanager
+    async def aslot(self, priority="interactive", session=None, tokens=1, timeout=None):
+        await self.aacquire(priority, session, tokens, timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def snapshot(self):
+        with self._lock:
+            return {"queued": self._queued, "in_flight": self._in_flight, **self.stats}
+
+
+class ScheduledChatModel(BaseChatModel):
+    """
+    Chat model wrapper whose every call first gets a slot from an LLMScheduler.
+
+    The session used for fair sharing comes from the runnable config metadata
+    (`config={"metadata": {"session_id": ...}}`).
+    """
+
+    inner: BaseChatModel
+    scheduler: LLMScheduler
+    priority: str = "interactive"
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    @property
+    def _llm_type(self):
+        return f"scheduled-{self.inner._llm_type}"
+
+    @property
+    def _identifying_params(self):
+        return self.inner._identifying_params
+
+    def _ticket_args(self, messages, run_manager):
+        session = (run_manager.metadata or {}).get("session_id") if run_manager else None
+        tokens = sum(estimate_tokens(str(message.content)) for message in messages)
+        return self.priority, session, tokens
+
+    def _slot(self, messages, run_manager):
+        return self.scheduler.slot(*self._ticket_args(messages, run_manager))
+
+    def _aslot(self, messages, run_manager):
+        return self.scheduler.aslot(*self._ticket_args(messages, run_manager))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        with self._slot(messages, run_manager):
+            return self.inner._generate(messages, stop=stop, **kwargs)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        with self._slot(messages, run_manager):
+            if type(self.inner)._stream is BaseChatModel._stream:
+                # The wrapped model can't stream, so hand back its whole answer as one chunk
+                message = self.inner._generate(messages, stop=stop, **kwargs).generations[0].message
+                yield ChatGenerationChunk(message=AIMessageChunk(content=message.content))
+            else:
+                yield from self.inner._stream(messages, stop=stop, **kwargs)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        async with self._aslot(messages, run_manager):
+            return await self.inner._agenerate(messages, stop=stop, **kwargs)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        async with self._aslot(messages, run_manager):
+            if type(self.inner)._astream is BaseChatModel._astream:
+                result = await self.inner._agenerate(messages, stop=stop, **kwargs)
+                yield ChatGenerationChunk(message=AIMessageChunk(content=result.generations[0].message.content))
+            else:
+                async for chunk in self.inner._astream(messages, stop=stop, **kwargs):
+                    yield chunk
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = LLMScheduler()
+    return _scheduler
@@ -0,0 +1,109 @@
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+
+ENABLED = os.getenv("PIPELINE_METRICS", "0") == "1"
+PREFIX = "ytchat"
+
+logger = logging.getLogger("ytchat.metrics")
+
+_lock = threading.Lock()
+_stage_seconds = {}
+_stage_calls = {}
+_counters = {}
+_disabled_stage = contextlib.nullcontext()
+
+
+def enable(enabled=True):
+    global ENABLED
+    ENABLED = enabled
+
+
+def count(name, value=1):
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(stage_name, seconds, **fields):
+    if not ENABLED:
+        return
+    with _lock:
+        _stage_seconds[stage_name] = _stage_seconds.get(stage_name, 0.0) + seconds
+        _stage_calls[stage_name] = _stage_calls.get(stage_name, 0) + 1
+    logger.info(json.dumps({"event": "stage", "stage": stage_name, "seconds": round(seconds, 6), **fields}))
+
+
+@contextlib.contextmanager
+def _timed_stage(stage_name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage_name, time.perf_counter() - start)
+
+
+def stage(stage_name):
+    """
+    Context manager timing one pipeline stage. A shared no-op when metrics are off.
+    """
+    if not ENABLED:
+        return _disabled_stage
+    return _timed_stage(stage_name)
+
+
+def snapshot():
+    with _lock:
+        return {
+            "stages": {
+                name: {"seconds": _stage_seconds[name], "calls": _stage_calls[name]}
+                for name in sorted(_stage_seconds)
+            },
+            "counters": dict(sorted(_counters.items())),
+        }
+
+
+def reset():
+    with _lock:
+        _stage_seconds.clear()
+        _stage_calls.clear()
+        _counters.clear()
+
+
+def render_prometheus():
+    """
+    Renders the current metrics in the Prometheus text exposition format.
+    """
+    data = snapshot()
+    lines = [
+        f"# HELP {PREFIX}_stage_seconds Wall time spent per pipeline stage.",
+        f"# TYPE {PREFIX}_stage_seconds summary",
+    ]
+    for name, values in data["stages"].items():
+        lines.append(f'{PREFIX}_stage_seconds_sum{{stage="{name}"}} {values["seconds"]:.6f}')
+        lines.append(f'{PREFIX}_stage_seconds_count{{stage="{name}"}} {values["calls"]}')
+    for name, value in data["counters"].items():
+        lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+        lines.append(f"{PREFIX}_{name}_total {value}")
+    return "\n".join(lines) + "\n"
+
+
+_handler = None
+
+
+def callbacks():
+    """
+    Callbacks to pass in a runnable config; empty when metrics are off.
+    """
+    global _handler
+    if not ENABLED:
+        return []
+    if _handler is None:
+        # Imported here so the hot modules using stage()/count() don't load LangChain callbacks
+        from utils.metrics_callback import MetricsCallbackHandler
+        _handler = MetricsCallbackHandler()
+    return [_handler]
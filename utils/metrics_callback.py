@@ -0,0 +1,56 @@
+import time
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from utils.metrics import count, observe
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """
+    Times retrievers and LLM calls and counts LLM tokens from LangChain callbacks.
+    """
+
+    def __init__(self):
+        self._starts = {}
+
+    def _start(self, run_id, stage_name):
+        self._starts[run_id] = (stage_name, time.perf_counter())
+
+    def _end(self, run_id, **fields):
+        started = self._starts.pop(run_id, None)
+        if started is not None:
+            observe(started[0], time.perf_counter() - started[1], **fields)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        count("llm_calls")
+        self._start(run_id, "llm")
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        count("llm_calls")
+        self._start(run_id, "llm")
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        input_tokens = output_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                input_tokens += usage.get("input_tokens", 0)
+                output_tokens += usage.get("output_tokens", 0)
+        count("llm_input_tokens", input_tokens)
+        count("llm_output_tokens", output_tokens)
+        self._end(run_id, input_tokens=input_tokens, output_tokens=output_tokens)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        count("llm_errors")
+        self._end(run_id, error=str(error))
+
+    def on_retriever_start(self, serialized, query, *, run_id, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name") or "retriever"
+        self._start(run_id, f"retrieval:{name}")
+
+    def on_retriever_end(self, documents, *, run_id, **kwargs):
+        count("retrieved_chunks", len(documents))
+        self._end(run_id, documents=len(documents))
+
+    def on_retriever_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=str(error))
@@ -0,0 +1,115 @@
+import os
+import threading
+
+CHAT_MODEL = os.getenv("CHAT_MODEL", "models/gemini-1.5-flash")
+# "google" for Gemini embeddings, "hashing" for the offline CPU backend
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "google")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 100))
+HASHING_DIMENSION = int(os.getenv("HASHING_EMBEDDING_DIMENSION", 1024))
+# Remote embeddings go through the on-disk chunk cache unless this is "0"
+EMBEDDING_CACHE = os.getenv("EMBEDDING_CACHE", "1") == "1"
+# Chat calls share one priority scheduler and rate limit unless this is "0"
+LLM_SCHEDULER = os.getenv("LLM_SCHEDULER", "1") == "1"
+
+if EMBEDDING_BACKEND == "hashing":
+    EMBEDDING_MODEL = f"hashing-{HASHING_DIMENSION}-2"
+else:
+    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "models/embedding-001")
+
+_clients = {}
+# Re-entrant because some builders fetch other clients
+_lock = threading.RLock()
+
+
+def _get_or_build(name, build):
+    # Double-checked so concurrent first calls still build exactly one client
+    client = _clients.get(name)
+    if client is None:
+        with _lock:
+            client = _clients.get(name)
+            if client is None:
+                client = build()
+                _clients[name] = client
+    return client
+
+
+def _load_env():
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+def _build_base_chat_model():
+    _load_env()
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(model=CHAT_MODEL)
+
+
+def _scheduled(priority):
+    model = _get_or_build("base_chat_model", _build_base_chat_model)
+    if not LLM_SCHEDULER:
+        return model
+    from utils.llm_scheduler import ScheduledChatModel, get_scheduler
+    return ScheduledChatModel(inner=model, scheduler=get_scheduler(), priority=priority)
+
+
+def _build_chat_model():
+    return _scheduled("interactive")
+
+
+def _build_embedding():
+    from utils.embeddings import HashingEmbeddings, RemoteBatchedEmbeddings
+
+    if EMBEDDING_BACKEND == "hashing":
+        return HashingEmbeddings(dimension=HASHING_DIMENSION, batch_size=EMBEDDING_BATCH_SIZE)
+
+    _load_env()
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+    embedding = RemoteBatchedEmbeddings(
+        GoogleGenerativeAIEmbeddings(model=EMBEDDING_MODEL),
+        model_name=EMBEDDING_MODEL,
+        batch_size=EMBEDDING_BATCH_SIZE
+    )
+    if EMBEDDING_CACHE:
+        from utils.embedding_cache import CachedEmbeddings
+        # Hashing embeddings are cheaper to recompute than to look up, so only remote ones are cached
+        embedding = CachedEmbeddings(embedding)
+    return embedding
+
+
+def _build_cached_chat_model(priority):
+    from utils.llm_cache import with_llm_cache
+    # Summaries and compressions are deterministic per chunk, so they are memoized
+    return with_llm_cache(_scheduled(priority))
+
+
+def get_chat_model():
+    """
+    Returns the process-wide chat model for interactive Q&A, building it on first use.
+    """
+    return _get_or_build("chat_model", _build_chat_model)
+
+
+def get_cached_chat_model(priority="summary"):
+    """
+    Returns the process-wide chat model whose calls go through utils.llm_cache.
+
+    Summaries use the default "summary" priority so they queue behind interactive
+    Q&A; calls made while answering a question (e.g. LLM compression) pass "interactive".
+    """
+    name = "cached_chat_model" if priority == "summary" else f"cached_{priority}_chat_model"
+    return _get_or_build(name, lambda: _build_cached_chat_model(priority))
+
+
+def get_embedding():
+    """
+    Returns the process-wide embedding client, building it on first use.
+    """
+    return _get_or_build("embedding", _build_embedding)
+
+
+def register(name, client):
+    """
+    Overrides a client, e.g. with an offline fake in benchmarks.
+    """
+    with _lock:
+        _clients[name] = client
@@ -0,0 +1,101 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.embeddings import normalize_rows
+from utils.providers import get_embedding
+
+SIMILARITY_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", 0.92))
+TTL = int(os.getenv("ANSWER_CACHE_TTL", 24 * 3600))
+
+
+class _Bucket:
+    def __init__(self, dimension):
+        self.vectors = np.zeros((0, dimension), dtype=np.float32)
+        self.answers = []
+        self.expires_at = []
+
+
+class SemanticAnswerCache:
+    """
+    Answers keyed by question meaning rather than exact text.
+
+    Questions are grouped per (video_id, language, search_type). A new question
+    whose embedding is within `threshold` cosine similarity of a stored one gets
+    that stored answer. Buckets are evicted LRU (`max_buckets`); inside a bucket
+    the oldest answers go first (`max_entries`), and every answer expires after `ttl`.
+    """
+
+    def __init__(self, embedding_function=None, threshold=SIMILARITY_THRESHOLD, ttl=TTL,
+                 max_buckets=256, max_entries=64, clock=time.time):
+        self._embedding_function = embedding_function
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_buckets = max_buckets
+        self.max_entries = max_entries
+        self.clock = clock
+        self.stats = {"hits": 0, "misses": 0, "bypassed": 0}
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def embedding_function(self):
+        return self._embedding_function or get_embedding()
+
+    def embed(self, question):
+        return normalize_rows(np.asarray([self.embedding_function.embed_query(question)]))[0]
+
+    def lookup(self, key, question):
+        """
+        Returns (answer or None, question vector). Pass the vector back to `store`
+        on a miss so the question isn't embedded twice.
+        """
+        vector = self.embed(question)
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None and bucket.answers:
+                self._buckets.move_to_end(key)
+                similarities = bucket.vectors @ vector
+                similarities[np.asarray(bucket.expires_at) <= now] = -1.0
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    self.stats["hits"] += 1
+                    return bucket.answers[best], vector
+            self.stats["misses"] += 1
+            return None, vector
+
+    def store(self, key, vector, answer):
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = _Bucket(len(vector))
+            self._buckets.move_to_end(key)
+
+            # Drop expired answers, then the oldest ones past max_entries
+            live = [i for i, expires_at in enumerate(bucket.expires_at) if expires_at > now]
+            live = live[-(self.max_entries - 1):] if self.max_entries > 1 else []
+            bucket.vectors = np.vstack([bucket.vectors[live], vector[None, :]])
+            bucket.answers = [bucket.answers[i] for i in live] + [answer]
+            bucket.expires_at = [bucket.expires_at[i] for i in live] + [now + self.ttl]
+
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+
+    def bypass(self):
+        """
+        Records a request that skipped the cache, so the hit rate stays honest.
+        """
+        with self._lock:
+            self.stats["bypassed"] += 1
+
+    def hit_rate(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+
+answer_cache = SemanticAnswerCache()
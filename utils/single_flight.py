@@ -0,0 +1,30 @@
+import asyncio
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent async calls with the same key into one execution.
+
+    The first caller starts the work; everyone else arriving before it finishes
+    awaits the same future. A caller that gets cancelled doesn't cancel the
+    shared work for the others.
+    """
+
+    def __init__(self):
+        self.stats = {"calls": 0, "executions": 0, "coalesced": 0}
+        self._inflight = {}
+
+    async def do(self, key, fn):
+        self.stats["calls"] += 1
+        future = self._inflight.get(key)
+        if future is None:
+            self.stats["executions"] += 1
+            future = asyncio.ensure_future(fn())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.stats["coalesced"] += 1
+        return await asyncio.shield(future)
+
+    def in_flight(self):
+        return len(self._inflight)
@@ -0,0 +1,76 @@
+import numpy as np
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from utils import metrics
+
+
+class SegmentIndex:
+    """
+    Maps character offsets in the joined transcript back to video time.
+
+    Segment offsets and times live in parallel NumPy arrays (~24 bytes per
+    segment instead of a dict each), and lookups are a binary search.
+    """
+
+    def __init__(self, transcript_list):
+        texts = [segment["text"] for segment in transcript_list]
+        lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+
+        # Segments are joined with one space, same as get_transcript
+        self.offsets = np.zeros(len(texts), dtype=np.int64)
+        if len(texts) > 1:
+            np.cumsum(lengths[:-1] + 1, out=self.offsets[1:])
+        self.starts = np.fromiter((segment["start"] for segment in transcript_list),
+                                  dtype=np.float64, count=len(texts))
+        durations = np.fromiter((segment.get("duration", 0.0) for segment in transcript_list),
+                                dtype=np.float64, count=len(texts))
+        self.ends = self.starts + durations
+        self.text = " ".join(texts)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def segment_at(self, char_offset):
+        position = int(np.searchsorted(self.offsets, char_offset, side="right")) - 1
+        return min(max(position, 0), len(self.offsets) - 1)
+
+    def time_at(self, char_offset):
+        return float(self.starts[self.segment_at(char_offset)])
+
+    def span_times(self, start_char, end_char):
+        """
+        Returns (start, end) seconds covered by the character span [start_char, end_char).
+        """
+        first = self.segment_at(start_char)
+        last = self.segment_at(max(start_char, end_char - 1))
+        return float(self.starts[first]), float(self.ends[last])
+
+
+def split_segments(transcript_list, chunk_size=1200, chunk_overlap=200, video_id=None):
+    """
+    Splits a transcript segment list (or a SegmentIndex built from one) into
+    Documents that carry their time span.
+
+    Chunk boundaries match split_text on the joined transcript; each chunk's
+    metadata gets `start`/`end` seconds and the character `start_index`.
+    """
+    with metrics.stage("split"):
+        chunks = _split_segments(transcript_list, chunk_size, chunk_overlap, video_id)
+    metrics.count("chunks", len(chunks))
+    return chunks
+
+
+def _split_segments(transcript_list, chunk_size, chunk_overlap, video_id):
+    index = transcript_list if isinstance(transcript_list, SegmentIndex) else SegmentIndex(transcript_list)
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap,
+                                              add_start_index=True)
+    chunks = splitter.create_documents([index.text])
+
+    for chunk in chunks:
+        start_char = chunk.metadata["start_index"]
+        start, end = index.span_times(start_char, start_char + len(chunk.page_content))
+        chunk.metadata["start"] = start
+        chunk.metadata["end"] = end
+        if video_id:
+            chunk.metadata["video_id"] = video_id
+    return chunks
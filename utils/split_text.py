@@ -1,34 +1,13 @@
-# chatbot.py
-
-from dotenv import load_dotenv
-from youtube_transcript_api import YouTubeTranscriptApi
-from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
-from langchain_community.vectorstores import FAISS
-from langchain_core.prompts import PromptTemplate
-from langchain_core.runnables import RunnableParallel, RunnablePassthrough, RunnableLambda
-from langchain_core.output_parsers import StrOutputParser
-import re
-from urllib.parse import urlparse, parse_qs
-from summarization_chain import build_full_summarization_chain
-
-from langchain.retrievers import ContextualCompressionRetriever
-from langchain.retrievers.document_compressors import LLMChainExtractor
 
+from utils import metrics
 
 
 def split_text(transcript,chunk_size=1200,chunk_overlap=200):
-    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-    chunks = splitter.create_documents([transcript])
+    with metrics.stage("split"):
+        # start_index lets format_docs merge overlapping chunks back together
+        splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap,
+                                                  add_start_index=True)
+        chunks = splitter.create_documents([transcript])
+    metrics.count("chunks", len(chunks))
     return chunks
-
-
-
-
-
-
-
-
-
-
@@ -0,0 +1,26 @@
+import time
+
+
+class TimedStream:
+    """
+    Wraps a token iterator and records time-to-first-token and total time.
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.time_to_first_token = None
+        self.total_time = None
+
+    def __iter__(self):
+        start = time.perf_counter()
+        for token in self.tokens:
+            if self.time_to_first_token is None:
+                self.time_to_first_token = time.perf_counter() - start
+            yield token
+        self.total_time = time.perf_counter() - start
+
+    def summary(self):
+        if self.total_time is None:
+            return ""
+        first = self.time_to_first_token if self.time_to_first_token is not None else self.total_time
+        return f"⏱️ First token after {first:.2f}s · total {self.total_time:.2f}s"
@@ -0,0 +1,191 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from youtube_transcript_api import YouTubeTranscriptApi
+from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
+
+from utils import metrics
+
+DB_PATH = os.getenv("TRANSCRIPT_CACHE_DB", os.path.join(".cache", "transcripts.sqlite3"))
+TRANSCRIPT_TTL = int(os.getenv("TRANSCRIPT_CACHE_TTL", 7 * 24 * 3600))
+LANGUAGES_TTL = int(os.getenv("TRANSCRIPT_LANGUAGES_TTL", 24 * 3600))
+NEGATIVE_TTL = int(os.getenv("TRANSCRIPT_NEGATIVE_TTL", 3600))
+
+DISABLED_MESSAGE = "Transcripts are disabled for this video."
+NOT_FOUND_MESSAGE = "No transcript found in the specified language."
+
+
+def fetch_transcript(video_id, language):
+    return YouTubeTranscriptApi.get_transcript(video_id, languages=[language])
+
+
+def fetch_transcript_languages(video_id):
+    return [
+        {
+            "language": transcript.language,
+            "code": transcript.language_code,
+            "auto_generated": transcript.is_generated
+        }
+        for transcript in YouTubeTranscriptApi.list_transcripts(video_id)
+    ]
+
+
+class TranscriptCache:
+    """
+    Two-tier transcript store: an in-process LRU in front of a compressed SQLite table.
+    Both tiers hold the zlib-compressed JSON, so the LRU costs a fraction of the
+    segment dicts it stands for; they're decoded on each hit.
+
+    Successful fetches are kept for `ttl` seconds. TranscriptsDisabled and
+    NoTranscriptFound are cached for `negative_ttl` so repeated misses don't
+    hit YouTube again. Other errors (network, rate limits) are never cached.
+    """
+
+    def __init__(self, fetcher=fetch_transcript, lister=fetch_transcript_languages, db_path=DB_PATH,
+                 ttl=TRANSCRIPT_TTL, languages_ttl=LANGUAGES_TTL, negative_ttl=NEGATIVE_TTL,
+                 max_memory_entries=128, clock=time.time):
+        self.fetcher = fetcher
+        self.lister = lister
+        self.db_path = db_path
+        self.ttl = ttl
+        self.languages_ttl = languages_ttl
+        self.negative_ttl = negative_ttl
+        self.max_memory_entries = max_memory_entries
+        self.clock = clock
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "negative_hits": 0}
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self):
+        # Opened lazily so importing the module never touches the disk
+        if self._conn is None:
+            if self.db_path != ":memory:":
+                os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS transcripts ("
+                "key TEXT PRIMARY KEY, status TEXT NOT NULL, payload BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+        return self._conn
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _get(self, key):
+        now = self.clock()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[2] > now:
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return _decoded(entry)
+                del self._memory[key]
+
+            row = self._db().execute(
+                "SELECT status, payload, expires_at FROM transcripts WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[2] <= now:
+                self._db().execute("DELETE FROM transcripts WHERE key = ?", (key,))
+                self._db().commit()
+                return None
+
+            self._remember(key, row)
+            self.stats["disk_hits"] += 1
+            return _decoded(row)
+
+    def _put(self, key, status, payload, ttl):
+        entry = (status, zlib.compress(json.dumps(payload).encode("utf-8")), self.clock() + ttl)
+        with self._lock:
+            self._remember(key, entry)
+            self._db().execute(
+                "INSERT OR REPLACE INTO transcripts (key, status, payload, expires_at) VALUES (?, ?, ?, ?)",
+                (key, *entry)
+            )
+            self._db().commit()
+        return status, payload, entry[2]
+
+    def _lookup(self, key, fetch, ttl):
+        entry = self._get(key)
+        if entry is not None:
+            if entry[0] != "ok":
+                self.stats["negative_hits"] += 1
+            return entry
+
+        self.stats["misses"] += 1
+        try:
+            return self._put(key, "ok", fetch(), ttl)
+        except TranscriptsDisabled:
+            return self._put(key, "disabled", DISABLED_MESSAGE, self.negative_ttl)
+        except NoTranscriptFound:
+            return self._put(key, "not_found", NOT_FOUND_MESSAGE, self.negative_ttl)
+
+    def get_transcript(self, video_id, language):
+        """
+        Same contract as utils.get_transcript.get_transcript: (text, transcript_list),
+        or (error message, []) when no transcript is available.
+        """
+        try:
+            status, payload, _ = self._lookup(
+                f"transcript:{video_id}:{language}",
+                lambda: self.fetcher(video_id, language),
+                self.ttl
+            )
+        except Exception as e:
+            return f"An unexpected error occurred: {e}", []
+
+        if status != "ok":
+            return payload, []
+        return " ".join(chunk["text"] for chunk in payload), payload
+
+    def list_available_transcript_languages(self, video_id):
+        try:
+            status, payload, _ = self._lookup(
+                f"languages:{video_id}",
+                lambda: self.lister(video_id),
+                self.languages_ttl
+            )
+        except Exception as e:
+            return {"error": str(e)}
+
+        if status != "ok":
+            return {"error": payload}
+        return payload
+
+    def invalidate(self, video_id, language=None):
+        keys = [f"languages:{video_id}"]
+        if language is not None:
+            keys.append(f"transcript:{video_id}:{language}")
+        with self._lock:
+            for key in keys:
+                self._memory.pop(key, None)
+                self._db().execute("DELETE FROM transcripts WHERE key = ?", (key,))
+            self._db().commit()
+
+
+def _decoded(entry):
+    status, blob, expires_at = entry
+    return status, json.loads(zlib.decompress(blob)), expires_at
+
+
+transcript_cache = TranscriptCache()
+
+
+def get_transcript(video_id, language):
+    with metrics.stage("get_transcript"):
+        return transcript_cache.get_transcript(video_id, language)
+
+
+def list_available_transcript_languages(video_id):
+    return transcript_cache.list_available_transcript_languages(video_id)
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+
+import faiss
+from langchain_community.vectorstores import FAISS
+
+from utils.compact_vectorstore import create_compact_vectorstore
+from utils.create_vectorstore import create_vectorstore
+from utils.providers import EMBEDDING_MODEL, get_embedding
+from utils.split_segments import split_segments
+from utils.split_text import split_text
+
+CACHE_DIR = os.getenv("VECTORSTORE_CACHE_DIR", os.path.join(".cache", "vectorstores"))
+MAX_CACHE_BYTES = int(os.getenv("VECTORSTORE_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+# "flat" keeps exact float32 vectors; "fp16", "sq8" and "pq" trade recall for memory
+INDEX_TYPE = os.getenv("VECTORSTORE_INDEX_TYPE", "flat")
+# IO_FLAG_MMAP only maps IVF inverted lists; flat and quantized codes are
+# mapped too with IO_FLAG_MMAP_IFC, which only newer faiss releases have
+READ_FLAGS = faiss.IO_FLAG_MMAP | getattr(faiss, "IO_FLAG_MMAP_IFC", 0) | faiss.IO_FLAG_READ_ONLY
+
+cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+_lock = threading.Lock()
+
+
+def make_cache_key(video_id, language, chunk_size, chunk_overlap, embedding_model=EMBEDDING_MODEL,
+                   splitter="text", index_type="flat"):
+    """
+    Returns a content-addressed key for a transcript index.
+    Anything that changes the stored vectors or chunk metadata must be part of the key.
+    """
+    payload = json.dumps(
+        {
+            "video_id": video_id,
+            "language": language,
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+            "embedding_model": embedding_model,
+            "splitter": splitter,
+            "index_type": index_type,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def embedding_model_name(embedding_function):
+    """
+    Name of the model behind an embedding client, as used in cache keys.
+    """
+    return getattr(embedding_function, "model_name", None) or type(embedding_function).__name__
+
+
+def _entry_path(key, cache_dir):
+    return os.path.join(cache_dir, key)
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def has_vectorstore(key, cache_dir=CACHE_DIR):
+    path = _entry_path(key, cache_dir)
+    return os.path.exists(os.path.join(path, "index.faiss")) and os.path.exists(os.path.join(path, "index.pkl"))
+
+
+def load_vectorstore(key, embedding_function=None, cache_dir=CACHE_DIR):
+    """
+    Loads a cached index, or returns None on a miss.
+    With a faiss that supports IO_FLAG_MMAP_IFC the vectors are memory-mapped
+    rather than copied; older versions read them fully into RAM.
+    """
+    path = _entry_path(key, cache_dir)
+    index_file = os.path.join(path, "index.faiss")
+    docstore_file = os.path.join(path, "index.pkl")
+    if not (os.path.exists(index_file) and os.path.exists(docstore_file)):
+        return None
+
+    try:
+        index = faiss.read_index(index_file, READ_FLAGS)
+        with open(docstore_file, "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+    except Exception:
+        # A half-written or corrupted entry is treated as a miss
+        shutil.rmtree(path, ignore_errors=True)
+        return None
+
+    # Bump the access time used by the LRU eviction
+    now = time.time()
+    os.utime(path, (now, now))
+    return FAISS(embedding_function or get_embedding(), index, docstore, index_to_docstore_id)
+
+
+def save_vectorstore(key, vector_store, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _entry_path(key, cache_dir)
+
+    # Write to a temp dir first so readers never see a partial entry
+    tmp_path = tempfile.mkdtemp(dir=cache_dir, prefix=".tmp-")
+    try:
+        vector_store.save_local(tmp_path)
+        if os.path.exists(path):
+            shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+    evict(cache_dir=cache_dir, max_bytes=max_bytes)
+
+
+def evict(cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    """
+    Removes least recently used entries until the cache fits in max_bytes.
+    """
+    if not os.path.isdir(cache_dir):
+        return
+
+    entries = []
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if name.startswith(".tmp-") or not os.path.isdir(path):
+            continue
+        entries.append((os.path.getmtime(path), _dir_size(path), path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        with _lock:
+            cache_stats["evictions"] += 1
+
+
+def get_or_create_vectorstore(video_id, language, transcript, chunk_size=1200, chunk_overlap=200,
+                              embedding_function=None, embedding_model=None,
+                              cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, transcript_list=None,
+                              index_type=INDEX_TYPE):
+    """
+    Returns the FAISS index for a transcript, building and persisting it on a miss.
+    When `transcript_list` (segments or a SegmentIndex) is given, chunks carry their video timestamps.
+    The key's embedding model defaults to the one behind `embedding_function`.
+    """
+    splitter = "segments" if transcript_list else "text"
+    embedding_function = embedding_function or get_embedding()
+    embedding_model = embedding_model or embedding_model_name(embedding_function)
+    key = make_cache_key(video_id, language, chunk_size, chunk_overlap, embedding_model, splitter, index_type)
+
+    vector_store = load_vectorstore(key, embedding_function, cache_dir)
+    if vector_store is not None:
+        with _lock:
+            cache_stats["hits"] += 1
+        return vector_store
+
+    with _lock:
+        cache_stats["misses"] += 1
+
+    if transcript_list:
+        chunks = split_segments(transcript_list, chunk_size=chunk_size, chunk_overlap=chunk_overlap,
+                                video_id=video_id)
+    else:
+        chunks = split_text(transcript, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    if index_type == "flat":
+        vector_store = create_vectorstore(chunks, embedding_function)
+    else:
+        # Segments are joined with single spaces, so the transcript is the shared text buffer
+        vector_store = create_compact_vectorstore(chunks, transcript, embedding_function, index_type,
+                                                  video_id=video_id)
+    save_vectorstore(key, vector_store, cache_dir, max_bytes)
+    return vector_store
@@ -0,0 +1,103 @@
+import threading
+
+from utils.create_qa_chain import create_qa_chain
+from utils.semantic_cache import answer_cache
+from utils.split_segments import SegmentIndex
+from utils.transcript_cache import get_transcript
+from utils.vectorstore_cache import get_or_create_vectorstore
+
+
+class VideoPipeline:
+    """
+    Everything built for one (video, language): transcript, vector store and chains.
+
+    Each piece is built on first use and then reused, so follow-up questions only
+    pay for retrieval and one LLM call. Instances are shared between Streamlit
+    sessions, so building is guarded by locks: one per stage, so a long index
+    build doesn't hold up the transcript or summary chains.
+    """
+
+    def __init__(self, video_id, language, transcript_source=get_transcript):
+        self.video_id = video_id
+        self.language = language
+        self.transcript_source = transcript_source
+        self.transcript = None
+        # Segment offsets and times as arrays; the fetched list of dicts isn't kept
+        self.segments = None
+        self._vector_store = None
+        self._chains = {}
+        self._transcript_lock = threading.Lock()
+        self._index_lock = threading.Lock()
+        self._chains_lock = threading.Lock()
+
+    def load_transcript(self):
+        """
+        Fetches the transcript once. Returns an error message, or None on success.
+        Errors are not kept here; the transcript cache decides which ones are sticky.
+        """
+        with self._transcript_lock:
+            if self.transcript is None:
+                transcript, transcript_list = self.transcript_source(self.video_id, self.language)
+                if isinstance(transcript, str) and not transcript_list:
+                    return transcript
+                self.segments = SegmentIndex(transcript_list)
+                self.transcript = self.segments.text
+            return None
+
+    def ready(self, artifact):
+        """
+        Whether "transcript", "index" or a chain ("qa:<search_type>", "concise_summary",
+        "detailed_summary") is already built, so callers can skip a trip to a build pool.
+        """
+        if artifact == "transcript":
+            return self.transcript is not None
+        if artifact == "index":
+            return self._vector_store is not None
+        return artifact in self._chains
+
+    @property
+    def vector_store(self):
+        if self._vector_store is None:
+            with self._index_lock:
+                if self._vector_store is None:
+                    self._vector_store = get_or_create_vectorstore(
+                        self.video_id, self.language, self.transcript, transcript_list=self.segments
+                    )
+        return self._vector_store
+
+    def _chain(self, key, build):
+        # Double-checked so reading a built chain never waits on another chain's build
+        chain = self._chains.get(key)
+        if chain is None:
+            with self._chains_lock:
+                chain = self._chains.get(key)
+                if chain is None:
+                    chain = build()
+                    self._chains[key] = chain
+        return chain
+
+    def qa_chain(self, search_type):
+        # Built before taking the chains lock so indexing doesn't block the summary chains
+        vector_store = self.vector_store
+        return self._chain(f"qa:{search_type}", lambda: create_qa_chain(
+            vector_store=vector_store, search_type=search_type, language=self.language, transcript=self.transcript
+        ))
+
+    def cached_answer(self, question, search_type):
+        """
+        Returns (answer or None, question vector) from the semantic answer cache.
+        """
+        return answer_cache.lookup((self.video_id, self.language, search_type), question)
+
+    def remember_answer(self, search_type, question_vector, answer):
+        answer_cache.store((self.video_id, self.language, search_type), question_vector, answer)
+
+    def concise_summary_chain(self):
+        return self._chain("concise_summary", lambda: create_qa_chain(
+            summaryType="concise_summary", transcript=self.transcript, language=self.language
+        ))
+
+    def detailed_summary_chain(self):
+        return self._chain("detailed_summary", lambda: create_qa_chain(
+            summaryType="detailed_summary", transcript=self.transcript, language=self.language
+        ))
@@ -0,0 +1,114 @@
+import os
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+MAX_WARMUPS = int(os.getenv("MAX_WARMUPS", 2))
+
+
+class _Job:
+    __slots__ = ("future", "cancelled", "transcript_ready", "owners")
+
+    def __init__(self):
+        self.future = None
+        self.cancelled = threading.Event()
+        # Set once the transcript stage is over, whether it succeeded or not
+        self.transcript_ready = threading.Event()
+        self.owners = set()
+
+
+class WarmupManager:
+    """
+    Builds video pipelines in the background before anyone asks for them.
+
+    At most `max_workers` warm-ups run at once per process; more are queued.
+    A warm-up is shared by every session (`owner`) that started it, and
+    `cancel` only stops it once no owner is left: a queued warm-up is dropped
+    outright, a running one stops between the transcript fetch and the
+    (expensive) indexing step.
+    """
+
+    def __init__(self, max_workers=MAX_WARMUPS):
+        self.stats = {"started": 0, "reused": 0, "cancelled": 0, "failed": 0}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="warmup")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _key(self, pipeline):
+        return (pipeline.video_id, pipeline.language)
+
+    def _run(self, pipeline, job):
+        try:
+            if job.cancelled.is_set():
+                return False
+            if pipeline.load_transcript():
+                return False
+        finally:
+            job.transcript_ready.set()
+        if job.cancelled.is_set():
+            return False
+        pipeline.vector_store
+        return True
+
+    def start(self, pipeline, owner=None):
+        """
+        Starts warming `pipeline` unless a warm-up for it is already queued or running,
+        in which case `owner` joins that one.
+        """
+        key = self._key(pipeline)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not job.future.cancelled():
+                job.owners.add(owner)
+                self.stats["reused"] += 1
+                return job.future
+            job = _Job()
+            job.owners.add(owner)
+            job.future = self._executor.submit(self._run, pipeline, job)
+            self._jobs[key] = job
+            self.stats["started"] += 1
+        job.future.add_done_callback(lambda f: self._forget(key, f))
+        return job.future
+
+    def _forget(self, key, future):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.future is future:
+                del self._jobs[key]
+        if not future.cancelled() and future.exception() is not None:
+            self.stats["failed"] += 1
+
+    def cancel(self, video_id, language, owner=None):
+        with self._lock:
+            job = self._jobs.get((video_id, language))
+            if job is None:
+                return
+            job.owners.discard(owner)
+            if job.owners:
+                # Another session still wants this warm-up
+                return
+            del self._jobs[(video_id, language)]
+        job.cancelled.set()
+        job.future.cancel()
+        job.transcript_ready.set()
+        self.stats["cancelled"] += 1
+
+    def wait(self, pipeline, timeout=None, stage="index"):
+        """
+        Blocks until an in-flight warm-up of `pipeline` gets past `stage`
+        ("transcript" or "index"). Errors are swallowed here; the caller's own
+        build step will surface them.
+        """
+        with self._lock:
+            job = self._jobs.get(self._key(pipeline))
+        if job is None:
+            return
+        if stage == "transcript":
+            job.transcript_ready.wait(timeout)
+            return
+        try:
+            job.future.result(timeout=timeout)
+        except (CancelledError, Exception):
+            pass
+
+
+warmups = WarmupManager()